@@ -0,0 +1,192 @@
+"""
+This script measures the performance of thumbframes_dl's hot paths against the recorded test assets,
+served by a local stand-in for YouTube, so the results don't depend on the network.
+Results are printed as JSON, or saved in a file with --output, so they can be compared across releases.
+"""
+from sys import path
+from os.path import realpath, dirname
+# the repo goes first so its test package is used instead of the standard library's
+path.insert(0, realpath(dirname(realpath(__file__)) + '/../'))
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import time
+
+from typing import Any, Callable, Optional
+
+from thumbframes_dl import MemoryCache, Session, YouTubeFrames, __version__, set_image_cache
+from thumbframes_dl.extractors.base import ThumbFramesImageList, async_download_images, download_images
+from thumbframes_dl.extractors.youtube_spec import StoryboardSpec
+from test.youtube_server import YouTubeServer
+
+# Spring | Blender Animation Studio | CC BY 4.0
+VIDEO_ID = 'WhWc3b3KhnY'
+
+
+def measure(name: str, params: dict[str, Any], run: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None,
+            repeat: int = 5, ops: int = 1, items: Optional[int] = None) -> dict[str, Any]:
+    """
+    Call run repeat times with whatever setup returns, which isn't timed, and return the timings in seconds
+    of each of the ops operations that run does. If items is set, the throughput of each run is included too.
+    """
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        run(state)
+        timings.append((time.perf_counter() - start) / ops)
+
+    result: dict[str, Any] = {
+        'name': name,
+        'params': params,
+        'repeat': repeat,
+        'ops': ops,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+    if items:
+        result['items_per_second'] = items / (result['median'] * ops)
+    logging.info('{name} {params}: {median:.6f}s'.format(**result))
+    return result
+
+
+def benchmark_construction(server: YouTubeServer, repeat: int) -> list[dict[str, Any]]:
+    """
+    Create videos that download and parse the video's page, and lazy videos that don't download anything.
+    """
+    def _construct(session: Session) -> None:
+        server.YouTubeFrames(VIDEO_ID, session=session)
+
+    def _construct_lazy(_: Any) -> None:
+        for _ in range(100):
+            server.YouTubeFrames(VIDEO_ID, lazy=True)
+
+    return [
+        measure('construction', {'lazy': False}, _construct, setup=Session, repeat=repeat),
+        measure('construction', {'lazy': True}, _construct_lazy, repeat=repeat, ops=100),
+    ]
+
+
+def benchmark_spec_parsing(server: YouTubeServer, repeat: int) -> list[dict[str, Any]]:
+    """
+    Parse the recorded storyboard spec, on its own and into each format's image list.
+    """
+    match = re.search(rb'"playerStoryboardSpecRenderer"\s*:\s*\{\s*"spec"\s*:\s*"((?:[^"\\]|\\.)*)"',
+                      server.player_response)
+    assert match is not None
+    sb_spec = json.loads(b'"' + match.group(1) + b'"')
+    video = server.YouTubeFrames(VIDEO_ID, lazy=True)
+
+    def _parse(_: Any) -> None:
+        for _ in range(1000):
+            StoryboardSpec(sb_spec)
+
+    def _get_storyboards(_: Any) -> None:
+        for _ in range(1000):
+            video._duration = None
+            video._get_storyboards_from_spec(sb_spec)
+
+    return [
+        measure('spec_parsing', {'image_lists': False}, _parse, repeat=repeat, ops=1000),
+        measure('spec_parsing', {'image_lists': True}, _get_storyboards, repeat=repeat, ops=1000),
+    ]
+
+
+def benchmark_thumbframe_formats(server: YouTubeServer, repeat: int) -> list[dict[str, Any]]:
+    """
+    Compute the formats of videos restored from their metadata, so nothing is downloaded.
+    """
+    # the stand-in's watch URL isn't a valid YouTube URL, so videos are restored from their ID
+    data = dict(server.YouTubeFrames(VIDEO_ID).to_dict(), video_url=VIDEO_ID)
+
+    def _setup() -> list[YouTubeFrames]:
+        return [server.YouTubeFrames.from_dict(data) for _ in range(100)]  # type: ignore[misc]
+
+    def _get_formats(videos: list[YouTubeFrames]) -> None:
+        for video in videos:
+            video.thumbframe_formats
+
+    return [measure('thumbframe_formats', {}, _get_formats, setup=_setup, repeat=repeat, ops=100)]
+
+
+def benchmark_downloads(server: YouTubeServer, repeat: int, sheet_counts: list[int], concurrencies: list[int]
+                        ) -> list[dict[str, Any]]:
+    """
+    Download formats with sheet_counts sheets, with threads and with asyncio, at each level of concurrency.
+    Every run uses a new Session and image cache, so nothing is downloaded from a cache.
+    """
+    def _setup(n_sheets: int) -> Callable[[], ThumbFramesImageList]:
+        def _new_images() -> ThumbFramesImageList:
+            set_image_cache(MemoryCache())
+            return ThumbFramesImageList(url_template=server.base_url + '/sb/benchmark/M$M.jpg', placeholder='$M',
+                                        frame_width=160, frame_height=90, cols=5, rows=5,
+                                        total_frames=n_sheets * 25, session=Session(pool_size=max(concurrencies)))
+        return _new_images
+
+    def _download(concurrency: int) -> Callable[[ThumbFramesImageList], None]:
+        def _run(images: ThumbFramesImageList) -> None:
+            assert not any(download_images(images, max_workers=concurrency))
+        return _run
+
+    def _async_download(concurrency: int) -> Callable[[ThumbFramesImageList], None]:
+        def _run(images: ThumbFramesImageList) -> None:
+            assert not any(asyncio.run(async_download_images(images, max_concurrency=concurrency)))
+        return _run
+
+    results = []
+    for n_sheets in sheet_counts:
+        for concurrency in concurrencies:
+            params = {'sheets': n_sheets, 'concurrency': concurrency, 'sheet_bytes': len(server.image)}
+            results.append(measure('download', dict(params, mode='threads'), _download(concurrency),
+                                   setup=_setup(n_sheets), repeat=repeat, items=n_sheets))
+            results.append(measure('download', dict(params, mode='asyncio'), _async_download(concurrency),
+                                   setup=_setup(n_sheets), repeat=repeat, items=n_sheets))
+    return results
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(',')]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs of each benchmark')
+    parser.add_argument('--sheets', type=_int_list, default=[4, 16, 64], help='Comma separated sheet counts')
+    parser.add_argument('--concurrency', type=_int_list, default=[1, 4, 8, 16],
+                        help='Comma separated levels of concurrency for downloads')
+    parser.add_argument('--sheet-bytes', type=int, default=50000, help='Size of each sheet served')
+    parser.add_argument('--output', help='Save the results in this file instead of printing them')
+    parser.add_argument('--verbose', action='store_true', help='Log each result as it is measured')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    server = YouTubeServer(image=os.urandom(args.sheet_bytes)).start()
+    try:
+        results = benchmark_construction(server, args.repeat) \
+            + benchmark_spec_parsing(server, args.repeat) \
+            + benchmark_thumbframe_formats(server, args.repeat) \
+            + benchmark_downloads(server, args.repeat, args.sheets, args.concurrency)
+    finally:
+        server.stop()
+
+    report = json.dumps({
+        'thumbframes_dl': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'results': results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
@@ -15,6 +15,7 @@ from enchant import Dict
 from enchant.checker import SpellChecker
 
 from thumbframes_dl import YouTubeFrames
+from thumbframes_dl.scenes import detect_scenes
 
 
 # Never Tell Me the Odds - Star Noirs One-off opening crawl | Saving Throw | CC BY 3.0
@@ -53,47 +54,39 @@ def parse_pytesseract_output(data):
     return text
 
 
-# get list of every line of text extracted from image
-def extract_text_from_frames(thumbframes_image):
-    # convert raw image's bytes to opencv image object
-    image = np.asarray(bytearray(thumbframes_image.get_image()), dtype='uint8')
-    image = cv2.imdecode(image, cv2.IMREAD_GRAYSCALE)
-
-    # set black text on white background
-    image = cv2.bitwise_not(image)
-
-    w_step = thumbframes_image.width // thumbframes_image.cols
-    h_step = thumbframes_image.height // thumbframes_image.rows
+# get list of every line of text extracted from frames
+def extract_text_from_frames(frames):
+    h_step, w_step = frames.shape[1:3]
     scanned_texts = []
-    for i in range(thumbframes_image.rows):
-        for j in range(thumbframes_image.cols):
-            # crop single frame from image
-            frame = image[i*h_step:(i+1)*h_step-1, j*w_step:(j+1)*w_step-1]
-
-            # crop bottom half of image (where crawling text is more visible) and try to straighten the text
-            crop_side = w_step // 5
-            crop_top = h_step // 2
-            src_box = np.array([[crop_side, crop_top],
-                                [w_step - crop_side, crop_top],
-                                [0, h_step],
-                                [w_step, h_step]],
-                               np.float32)
-            dst_box = np.array([[0, 0], [w_step, 0], [0, h_step], [w_step, h_step]], np.float32)
-            matrix = cv2.getPerspectiveTransform(src_box, dst_box)
-            text_area = cv2.warpPerspective(frame, matrix, (w_step, h_step))
-
-            # pytesseract works better with bigger images
-            text_area = cv2.resize(text_area, (w_step*5, h_step*5))
-
-            # extract frame's text
-            scanned_output = pytesseract.image_to_data(text_area,
-                                                       lang=LANG[1],
-                                                       config='--psm 6',
-                                                       output_type=pytesseract.Output.DICT)
-            scanned_lines = parse_pytesseract_output(scanned_output)
-            scanned_texts.append([line for line in scanned_lines if line != '' and not line.isspace()])
-
-            # cv2.imshow('', text_area); cv2.waitKey(0)
+    # iterate each frame, decoded as an RGB numpy array
+    for frame in frames:
+        # convert frame to grayscale and set black text on white background
+        frame = cv2.bitwise_not(cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY))
+
+        # crop bottom half of image (where crawling text is more visible) and try to straighten the text
+        crop_side = w_step // 5
+        crop_top = h_step // 2
+        src_box = np.array([[crop_side, crop_top],
+                            [w_step - crop_side, crop_top],
+                            [0, h_step],
+                            [w_step, h_step]],
+                           np.float32)
+        dst_box = np.array([[0, 0], [w_step, 0], [0, h_step], [w_step, h_step]], np.float32)
+        matrix = cv2.getPerspectiveTransform(src_box, dst_box)
+        text_area = cv2.warpPerspective(frame, matrix, (w_step, h_step))
+
+        # pytesseract works better with bigger images
+        text_area = cv2.resize(text_area, (w_step*5, h_step*5))
+
+        # extract frame's text
+        scanned_output = pytesseract.image_to_data(text_area,
+                                                   lang=LANG[1],
+                                                   config='--psm 6',
+                                                   output_type=pytesseract.Output.DICT)
+        scanned_lines = parse_pytesseract_output(scanned_output)
+        scanned_texts.append([line for line in scanned_lines if line != '' and not line.isspace()])
+
+        # cv2.imshow('', text_area); cv2.waitKey(0)
 
     return scanned_texts
 
@@ -153,9 +146,10 @@ def merge_extracted_texts(scanned_texts):
 if __name__ == "__main__":
     video = YouTubeFrames(VIDEO_URL)
 
-    scanned_texts = []
-    for thumbframes_image in video.get_thumbframes():
-        scanned_texts += extract_text_from_frames(thumbframes_image)
+    # skip frames that barely changed since the previous one, so the same text isn't scanned again and again
+    frames = video.get_frames_array()
+    changed_frames = [0] + list(detect_scenes(frames, threshold=0.02, method='pixel'))
+    scanned_texts = extract_text_from_frames(frames[changed_frames])
 
     video_text = merge_extracted_texts(scanned_texts)
     print(video_text)
@@ -33,5 +33,8 @@ setup(
         "Programming Language :: Python :: 3",
     ],
     install_requires=get_file_contents('requirements.txt', break_lines=True),
+    extras_require={
+        'frames': ['numpy', 'Pillow'],
+    },
     packages=find_packages(),
 )
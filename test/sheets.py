@@ -0,0 +1,48 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from thumbframes_dl.cache import get_image_cache, url_cache_key
+from thumbframes_dl.extractors.base import ThumbFramesImage
+
+
+def make_sheet(frame_width: int, frame_height: int, cols: int, rows: int, n_frames: int, first_frame: int = 0,
+               image_format: str = 'PNG') -> bytes:
+    """
+    Image with a cols*rows grid where each frame is filled with a color that identifies it.
+    Cells after n_frames are left black.
+    """
+    sheet = np.zeros((rows * frame_height, cols * frame_width, 3), dtype=np.uint8)
+    for i in range(n_frames):
+        row, col = divmod(i, cols)
+        sheet[row * frame_height:(row + 1) * frame_height, col * frame_width:(col + 1) * frame_width] = \
+            frame_color(first_frame + i)
+    output = BytesIO()
+    Image.fromarray(sheet).save(output, format=image_format)
+    return output.getvalue()
+
+
+def frame_color(frame_index: int) -> tuple[int, int, int]:
+    return (frame_index * 7) % 256, (frame_index * 13) % 256, 255 - frame_index % 256
+
+
+def make_thumbframes(frame_width: int, frame_height: int, cols: int, rows: int, total_frames: int
+                     ) -> list[ThumbFramesImage]:
+    """
+    Already downloaded ThumbFramesImages with total_frames frames split in as many sheets as needed.
+    """
+    thumbframes = []
+    frames_per_sheet = cols * rows
+    for first_frame in range(0, total_frames, frames_per_sheet):
+        n_frames = min(frames_per_sheet, total_frames - first_frame)
+        sheet_rows = -(-n_frames // cols)
+        tf_image = ThumbFramesImage(url='https://i.ytimg.com/sb/test/M{}.png'.format(first_frame // frames_per_sheet),
+                                    width=frame_width * cols, height=frame_height * sheet_rows,
+                                    cols=cols, rows=sheet_rows, n_frames=n_frames)
+        # the sheet is put in the image cache as if it had just been downloaded
+        get_image_cache().set(url_cache_key(tf_image.url),
+                              make_sheet(frame_width, frame_height, cols, sheet_rows, n_frames, first_frame))
+        tf_image.mime_type = 'png'
+        thumbframes.append(tf_image)
+    return thumbframes
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import logging
+import unittest
+
+from unittest import mock
+from youtube_dl.extractor.youtube import YoutubeIE
+from youtube_dl.utils import ExtractorError
+from thumbframes_dl import MemoryCache, RetryPolicy, Session, get_image_cache, set_image_cache
+
+from .youtube_server import YouTubeServer
+
+
+class TestAsyncYouTubeFrames(unittest.IsolatedAsyncioTestCase):
+
+    VIDEO_ID = 'WhWc3b3KhnY'
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.server = YouTubeServer().start()
+        set_image_cache(MemoryCache())
+        self.session = Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.server.stop()
+        logging.disable(logging.NOTSET)
+
+    async def test_async_from_url(self):
+        video = await self.server.YouTubeFrames.async_from_url(self.VIDEO_ID, session=self.session)
+        self.assertEqual(video.video_id, self.VIDEO_ID)
+        self.assertEqual(len(video.thumbframe_formats), 3)
+        self.assertEqual(len(self.server.requests), 1)
+
+    async def test_async_from_url_falls_back_to_api(self):
+        self.server.video_page = b'<!DOCTYPE html><html><head></head><body></body></html>'
+        video = await self.server.YouTubeFrames.async_from_url(self.VIDEO_ID, session=self.session)
+        self.assertEqual(len(video.thumbframe_formats), 3)
+        self.assertEqual(len(self.server.requests), 2)
+
+    async def test_async_from_url_with_api_first(self):
+        video = await self.server.YouTubeFrames.async_from_url(self.VIDEO_ID, session=self.session,
+                                                               fetch_strategy='api')
+        self.assertEqual(len(video.thumbframe_formats), 3)
+        # same API call as youtube_dl's, with its API key
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertTrue(self.server.requests[0].startswith('/youtubei/v1/player?key='))
+        url, data, headers = video._get_api_request('player', {'videoId': self.VIDEO_ID})
+        self.assertEqual(json.loads(data)['context'], YoutubeIE._DEFAULT_API_DATA['context'])
+        self.assertEqual(json.loads(data)['videoId'], self.VIDEO_ID)
+
+    async def test_async_get_thumbframes(self):
+        video = await self.server.YouTubeFrames.async_from_url(self.VIDEO_ID, session=self.session)
+
+        # all images are downloaded concurrently in the same event loop
+        thumbframes = await video.async_get_thumbframes('L2', lazy=False, max_concurrency=2)
+        self.assertEqual(len(self.server.requests), len(thumbframes) + 1)
+        for tf_image in thumbframes:
+            self.assertEqual(await tf_image.async_get_image(), self.server.image)
+            self.assertEqual(tf_image.mime_type, 'webp')
+
+        # no additional download here because images are already set
+        await asyncio.gather(*[tf_image.async_get_image() for tf_image in thumbframes])
+        self.assertEqual(len(self.server.requests), len(thumbframes) + 1)
+
+    async def test_async_iter_thumbframes(self):
+        video = await self.server.YouTubeFrames.async_from_url(self.VIDEO_ID, session=self.session)
+        thumbframes = video.get_thumbframes('L2')
+
+        streamed = [item async for item in video.async_iter_thumbframes('L2', prefetch=2)]
+        self.assertEqual([tf_image for tf_image, _ in streamed], thumbframes)
+        self.assertEqual([raw_image for _, raw_image in streamed], [self.server.image] * len(thumbframes))
+        self.assertEqual(len(get_image_cache()), 0)
+
+    async def test_async_methods_of_lazy_video(self):
+        video = self.server.YouTubeFrames(self.VIDEO_ID, session=self.session, lazy=True)
+        with mock.patch.object(video, 'download_thumbframe_info', side_effect=AssertionError):
+            # concurrent calls download the metadata once, with asyncio
+            results = await asyncio.gather(video.async_get_thumbframes('L2'), video.async_get_thumbframes('L2'),
+                                           video.async_prefetch())
+            self.assertEqual(len(self.server.requests), 1)
+            self.assertEqual(results[0], results[1])
+
+            video = self.server.YouTubeFrames(self.VIDEO_ID, session=self.session, lazy=True)
+            streamed = [tf_image async for tf_image, _ in video.async_iter_thumbframes('L2')]
+            self.assertEqual(streamed, video.get_thumbframes('L2'))
+
+    async def test_async_fetch_bad_status_line(self):
+        async def _respond(reader, writer):
+            await reader.readuntil(b'\r\n\r\n')
+            writer.write(b'HTTP/1.1\r\n\r\n')
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(_respond, '127.0.0.1', 0)
+        async with server:
+            url = 'http://127.0.0.1:{}/sb/M0.jpg'.format(server.sockets[0].getsockname()[1])
+            with self.assertRaises(ExtractorError):
+                await Session(retry_policy=RetryPolicy(max_retries=0)).async_fetch(url)
+
+    async def test_async_fail_with_bad_url(self):
+        with self.assertRaises(ExtractorError):
+            await self.server.YouTubeFrames.async_from_url('BAD_URL', session=self.session)
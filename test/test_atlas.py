@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from thumbframes_dl.atlas import SpriteAtlas
+from thumbframes_dl.webvtt import format_timestamp
+
+from .sheets import frame_color
+
+
+def _frames(total_frames, frame_width=4, frame_height=3):
+    frames = np.empty((total_frames, frame_height, frame_width, 3), dtype=np.uint8)
+    for i in range(total_frames):
+        frames[i] = frame_color(i)
+    return frames
+
+
+class TestSpriteAtlas(unittest.TestCase):
+
+    def test_single_atlas(self):
+        atlas = SpriteAtlas.from_frames(_frames(23), cols=5)
+        self.assertEqual(len(atlas.images), 1)
+        self.assertEqual(atlas.images[0].shape, (5 * 3, 5 * 4, 3))
+
+        _, x, y, width, height = atlas.get_frame_box(17)
+        self.assertEqual((x, y, width, height), (2 * 4, 3 * 3, 4, 3))
+        self.assertTrue((atlas.images[0][y:y + height, x:x + width] == frame_color(17)).all())
+
+        # cells after the last frame are left black
+        self.assertTrue((atlas.images[0][4 * 3:, 3 * 4:] == 0).all())
+
+    def test_fixed_size_atlases(self):
+        atlas = SpriteAtlas.from_frames(_frames(23), cols=5, rows=2)
+        self.assertEqual([image.shape for image in atlas.images], [(6, 20, 3), (6, 20, 3), (3, 20, 3)])
+
+        atlas_index, x, y, width, height = atlas.get_frame_box(21)
+        self.assertEqual((atlas_index, x, y), (2, 4, 0))
+        self.assertTrue((atlas.images[2][y:y + height, x:x + width] == frame_color(21)).all())
+
+        with self.assertRaises(IndexError):
+            atlas.get_frame_box(23)
+
+    def test_indexes(self):
+        atlas = SpriteAtlas.from_frames(_frames(12), cols=5, rows=2, frame_interval=2.5)
+        urls = ['a0.jpg', 'a1.jpg']
+
+        index = atlas.to_dict(urls)
+        self.assertEqual(index['atlases'], urls)
+        self.assertEqual(len(index['frames']), 12)
+        self.assertEqual(index['frames'][11], {'atlas': 1, 'x': 4, 'y': 0, 'w': 4, 'h': 3, 'start': 27.5, 'end': 30})
+
+        webvtt = atlas.to_webvtt(urls)
+        self.assertTrue(webvtt.startswith('WEBVTT\n\n00:00:00.000 --> 00:00:02.500\na0.jpg#xywh=0,0,4,3\n'))
+        self.assertIn('00:00:27.500 --> 00:00:30.000\na1.jpg#xywh=4,0,4,3\n', webvtt)
+
+        with self.assertRaises(ValueError):
+            SpriteAtlas.from_frames(_frames(12), cols=5).to_webvtt(urls)
+
+    def test_format_timestamp(self):
+        self.assertEqual(format_timestamp(3723.4567), '01:02:03.457')
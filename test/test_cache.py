@@ -0,0 +1,101 @@
+import tempfile
+import time
+import unittest
+
+from thumbframes_dl import DiskCache, MemoryCache
+from thumbframes_dl.cache import url_cache_key
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_and_set(self):
+        cache = DiskCache(self.tmp_dir.name)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', b'abc')
+        self.assertEqual(cache.get('a'), b'abc')
+        self.assertEqual(cache.stats, {'hits': 1, 'misses': 1, 'evictions': 0})
+        cache.delete('a')
+        self.assertIsNone(cache.get('a'))
+
+    def test_persistence(self):
+        cache = DiskCache(self.tmp_dir.name)
+        cache.set('a', b'abc')
+        cache.close()
+
+        # a new cache in the same directory finds the same entries
+        same_cache = DiskCache(self.tmp_dir.name)
+        self.assertEqual(same_cache.get('a'), b'abc')
+
+    def test_lru_eviction(self):
+        cache = DiskCache(self.tmp_dir.name, max_size=10)
+        cache.set('a', b'aaaa')
+        time.sleep(0.01)
+        cache.set('b', b'bbbb')
+        time.sleep(0.01)
+        cache.get('a')  # 'a' is now more recently used than 'b'
+        time.sleep(0.01)
+        cache.set('c', b'cccc')
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'aaaa')
+        self.assertEqual(cache.get('c'), b'cccc')
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.size, 10)
+
+    def test_ttl(self):
+        cache = DiskCache(self.tmp_dir.name, ttl=0.01)
+        cache.set('a', b'abc')
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+
+    def test_url_cache_key_ignores_signature(self):
+        url = 'https://i.ytimg.com/sb/WhWc3b3KhnY/storyboard3_L2/M0.jpg?sqp=abc%3D%3D&sigh=rs$AOn4CLA'
+        other_url = 'https://i.ytimg.com/sb/WhWc3b3KhnY/storyboard3_L2/M0.jpg?sqp=abc%3D%3D&sigh=rs$OTHER'
+        self.assertEqual(url_cache_key(url), url_cache_key(other_url))
+        self.assertNotIn('sigh', url_cache_key(url))
+        self.assertNotEqual(url_cache_key(url), url_cache_key(url.replace('M0', 'M1')))
+
+
+class TestMemoryCache(unittest.TestCase):
+
+    def test_get_and_set(self):
+        cache = MemoryCache()
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', b'abc')
+        self.assertEqual(cache.get('a'), b'abc')
+        self.assertEqual(cache.stats, {'hits': 1, 'misses': 1, 'evictions': 0})
+        cache.delete('a')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.size, 0)
+
+    def test_evict_least_recently_used(self):
+        cache = MemoryCache(max_size=6)
+        cache.set('a', b'abc')
+        cache.set('b', b'def')
+        cache.get('a')
+        cache.set('c', b'ghi')
+
+        # b was used less recently than a
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'abc')
+        self.assertEqual(cache.get('c'), b'ghi')
+        self.assertEqual(cache.size, 6)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_replace_entry(self):
+        cache = MemoryCache(max_size=6)
+        cache.set('a', b'abc')
+        cache.set('a', b'abcdef')
+        self.assertEqual(cache.size, 6)
+        self.assertEqual(len(cache), 1)
+
+        # values that are bigger than the whole cache aren't stored
+        cache.set('b', b'abcdefg')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'abcdef')
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from thumbframes_dl.hashing import average_hash, difference_hash, hamming_distance, signature_distance, \
+    video_signature
+
+
+def _gradient_frames(n_frames, height=27, width=48):
+    # frames with a horizontal gradient, each one shifted a bit more than the previous one
+    x = np.linspace(0, 200, width)
+    frames = np.empty((n_frames, height, width, 3), dtype=np.uint8)
+    for i in range(n_frames):
+        frames[i] = np.roll(x, i * 5)[np.newaxis, :, np.newaxis]
+    return frames
+
+
+class TestHashing(unittest.TestCase):
+
+    def test_hashes_are_vectorized(self):
+        frames = _gradient_frames(10)
+        for hash_frames in (average_hash, difference_hash):
+            hashes = hash_frames(frames)
+            self.assertEqual(hashes.shape, (10,))
+            self.assertEqual(hashes.dtype, np.uint64)
+            # same result as hashing frames one by one
+            self.assertEqual(list(hashes), [hash_frames(frames[i:i + 1])[0] for i in range(10)])
+
+    def test_similar_frames_have_similar_hashes(self):
+        frames = _gradient_frames(1)
+        brighter_frames = np.clip(frames.astype(int) + 30, 0, 255).astype(np.uint8)
+        mirrored_frames = frames[:, :, ::-1]
+        for hash_frames in (average_hash, difference_hash):
+            self.assertEqual(hamming_distance(hash_frames(frames), hash_frames(brighter_frames))[0], 0)
+            self.assertGreater(hamming_distance(hash_frames(frames), hash_frames(mirrored_frames))[0], 32)
+
+    def test_difference_hash_of_gradient(self):
+        # every block is brighter than the one to its left
+        self.assertEqual(difference_hash(_gradient_frames(1))[0], np.uint64(2 ** 64 - 1))
+
+    def test_frames_too_small(self):
+        with self.assertRaises(ValueError):
+            difference_hash(np.zeros((1, 8, 8, 3), dtype=np.uint8))
+
+    def test_video_signature(self):
+        hashes = difference_hash(_gradient_frames(100))
+        signature = video_signature(hashes, length=16)
+        self.assertEqual(len(signature), 16 * 8)
+        self.assertEqual(signature_distance(signature, signature), 0)
+
+        # same video with half the frames has a similar signature
+        self.assertLess(signature_distance(signature, video_signature(hashes[::2], length=16)), 0.1)
+        self.assertGreater(signature_distance(signature, video_signature(hashes[::-1], length=16)), 0.2)
+
+        with self.assertRaises(ValueError):
+            signature_distance(signature, video_signature(hashes, length=8))
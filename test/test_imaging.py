@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from thumbframes_dl.imaging import decode_image, frames_grid
+
+from .sheets import frame_color, make_sheet, make_thumbframes
+
+
+class TestFrames(unittest.TestCase):
+
+    def test_decode_image(self):
+        image_array = decode_image(make_sheet(4, 3, 5, 2, 10))
+        self.assertEqual(image_array.shape, (6, 20, 3))
+        self.assertEqual(image_array.dtype, np.uint8)
+
+    def test_frames_grid_is_a_view(self):
+        image_array = decode_image(make_sheet(4, 3, 5, 2, 10))
+        grid = frames_grid(image_array, cols=5, rows=2, frame_width=4, frame_height=3)
+        self.assertEqual(grid.shape, (2, 5, 3, 4, 3))
+        self.assertTrue(np.shares_memory(grid, image_array))
+        self.assertEqual(tuple(grid[1, 2, 0, 0]), frame_color(7))
+
+    def test_iter_frames_in_order(self):
+        tf_image = make_thumbframes(4, 3, cols=5, rows=2, total_frames=10)[0]
+        frames = list(tf_image.iter_frames())
+        self.assertEqual(len(frames), 10)
+        for i, frame in enumerate(frames):
+            self.assertEqual(frame.shape, (3, 4, 3))
+            self.assertTrue((frame == frame_color(i)).all())
+
+    def test_iter_frames_partial_sheet(self):
+        # 12 frames in 5x2 grids: the second sheet only has 2 frames in a single row
+        thumbframes = make_thumbframes(4, 3, cols=5, rows=2, total_frames=12)
+        self.assertEqual(thumbframes[1].rows, 1)
+        frames = list(thumbframes[1].iter_frames())
+        self.assertEqual(len(frames), 2)
+        self.assertTrue((frames[1] == frame_color(11)).all())
+
+    def test_iter_frames_as_pil(self):
+        tf_image = make_thumbframes(4, 3, cols=5, rows=2, total_frames=10)[0]
+        frames = list(tf_image.iter_frames(as_pil=True))
+        self.assertIsInstance(frames[0], Image.Image)
+        self.assertEqual(frames[0].size, (4, 3))
+        self.assertEqual(frames[3].getpixel((0, 0)), frame_color(3))
@@ -0,0 +1,97 @@
+import unittest
+
+from email.message import Message
+from unittest import mock
+
+from youtube_dl.compat import compat_HTTPError
+from youtube_dl.utils import ExtractorError
+from thumbframes_dl.ratelimit import RetryPolicy, TokenBucket
+
+
+def _http_error(code, headers=None):
+    message = Message()
+    for name, value in (headers or {}).items():
+        message[name] = value
+    return ExtractorError('HTTP Error {}'.format(code),
+                          cause=compat_HTTPError('https://i.ytimg.com/sb/M0.jpg', code, 'Error', message, None))
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    @mock.patch('thumbframes_dl.ratelimit.time.monotonic', return_value=100.0)
+    def test_burst_then_rate(self, _):
+        bucket = TokenBucket(rate=50, capacity=2)
+
+        # the first tokens are available right away, and the rest are handed out at the bucket's rate
+        waits = [bucket._reserve() for _ in range(5)]
+        self.assertEqual(waits[:2], [0, 0])
+        for wait, expected_wait in zip(waits[2:], [0.02, 0.04, 0.06]):
+            self.assertAlmostEqual(wait, expected_wait)
+
+    @mock.patch('thumbframes_dl.ratelimit.time.sleep')
+    def test_acquire_waits_for_reserved_token(self, sleep):
+        bucket = TokenBucket(rate=0.5)
+        bucket.acquire()
+        sleep.assert_not_called()
+        bucket.acquire()
+        self.assertAlmostEqual(sleep.call_args[0][0], 2, places=1)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_should_retry(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.should_retry(_http_error(429)))
+        self.assertTrue(policy.should_retry(_http_error(503)))
+        self.assertTrue(policy.should_retry(ExtractorError('timed out', cause=TimeoutError())))
+        self.assertFalse(policy.should_retry(_http_error(404)))
+        self.assertFalse(policy.should_retry(ExtractorError('no thumbframes')))
+
+    def test_exponential_backoff_with_jitter(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+        for retry in range(5):
+            delay = policy.get_delay(retry)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(2 ** retry, 5))
+
+        # Retry-After is honored, up to max_backoff
+        self.assertGreaterEqual(policy.get_delay(0, _http_error(429, {'Retry-After': '3'})), 3)
+        self.assertEqual(policy.get_delay(0, _http_error(429, {'Retry-After': '60'})), 5)
+
+    def test_call_retries(self):
+        policy = RetryPolicy(max_retries=2, backoff=0)
+        errors = [_http_error(503), _http_error(429)]
+
+        def _download():
+            if errors:
+                raise errors.pop(0)
+            return b'image'
+
+        self.assertEqual(policy.call('https://i.ytimg.com/sb/M0.jpg', _download), b'image')
+
+        # gives up after max_retries
+        errors = [_http_error(503)] * 3
+        with self.assertRaises(ExtractorError):
+            policy.call('https://i.ytimg.com/sb/M0.jpg', _download)
+        self.assertEqual(len(errors), 0)
+
+    @mock.patch('thumbframes_dl.ratelimit.time.monotonic', return_value=100.0)
+    def test_rate_limit_per_host(self, _):
+        policy = RetryPolicy(rate_limit=20)
+        bucket = policy._get_bucket('https://i.ytimg.com/sb/M0.jpg')
+        self.assertIs(policy._get_bucket('https://i.ytimg.com/sb/M1.jpg'), bucket)
+        self.assertEqual(bucket.rate, 20)
+        with mock.patch('thumbframes_dl.ratelimit.time.sleep'):
+            for _ in range(3):
+                policy.call('https://i.ytimg.com/sb/M0.jpg', lambda: None)
+        self.assertAlmostEqual(bucket._tokens, -2)
+
+        # other hosts have their own bucket, with all its tokens
+        other_bucket = policy._get_bucket('https://www.youtube.com/watch?v=WhWc3b3KhnY')
+        self.assertIsNot(other_bucket, bucket)
+        self.assertEqual(other_bucket._tokens, 1)
+        self.assertIsNone(RetryPolicy()._get_bucket('https://i.ytimg.com/sb/M0.jpg'))
@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from thumbframes_dl.scenes import CHUNK_FRAMES, detect_scenes, frame_differences
+
+
+def _scene_frames(colors, frames_per_scene=5, height=9, width=16):
+    # frames of scenes with a different color each, with some noise between frames of the same scene
+    rng = np.random.default_rng(0)
+    frames = []
+    for color in colors:
+        for _ in range(frames_per_scene):
+            noise = rng.integers(-3, 4, size=(height, width, 3))
+            frames.append(np.clip(np.array(color) + noise, 0, 255))
+    return np.array(frames, dtype=np.uint8)
+
+
+class TestScenes(unittest.TestCase):
+
+    def test_frame_differences(self):
+        frames = _scene_frames([(200, 30, 30), (30, 30, 200)])
+        for method in ('histogram', 'pixel'):
+            differences = frame_differences(frames, method=method)
+            self.assertEqual(differences.shape, (9,))
+            self.assertEqual(int(np.argmax(differences)), 4)
+            self.assertTrue(((differences >= 0) & (differences <= 1)).all())
+
+        with self.assertRaises(ValueError):
+            frame_differences(frames, method='edges')
+
+    def test_detect_scenes(self):
+        frames = _scene_frames([(200, 30, 30), (30, 30, 200), (30, 200, 30)])
+        self.assertEqual(list(detect_scenes(frames)), [5, 10])
+        self.assertEqual(list(detect_scenes(frames, method='pixel', threshold=0.2)), [5, 10])
+        self.assertEqual(list(detect_scenes(frames[:1])), [])
+
+    def test_min_scene_length(self):
+        # a single flashing frame only counts as a new scene if scenes can be that short
+        frames = _scene_frames([(200, 30, 30), (30, 30, 200), (200, 30, 30)], frames_per_scene=1)
+        frames = np.concatenate([frames[:1]] * 3 + [frames[1:2]] + [frames[2:]] * 3)
+        self.assertEqual(list(detect_scenes(frames)), [3, 4])
+        self.assertEqual(list(detect_scenes(frames, min_scene_length=2)), [3])
+
+    def test_chunks(self):
+        # scene changes at the border between chunks of frames are detected too
+        frames = _scene_frames([(200, 30, 30), (30, 30, 200), (30, 200, 30)], frames_per_scene=CHUNK_FRAMES)
+        for method in ('histogram', 'pixel'):
+            self.assertEqual(list(detect_scenes(frames, method=method, threshold=0.2)),
+                             [CHUNK_FRAMES, 2 * CHUNK_FRAMES])
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import sys
+import threading
+import unittest
+
+from http.cookiejar import Cookie
+from unittest import mock
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from youtube_dl.utils import ExtractorError
+from thumbframes_dl import MemoryCache, Session, set_image_cache
+from thumbframes_dl.ratelimit import RetryPolicy
+from thumbframes_dl.extractors.base import ThumbFramesImage, ThumbFramesImageList, download_images
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])  # type: ignore[attr-defined]
+        self.server.requests.append((self.path, self.headers.get('Cookie')))  # type: ignore[attr-defined]
+        if self.path.startswith('/flaky') and self.server.flaky_errors:  # type: ignore[attr-defined]
+            self.server.flaky_errors -= 1  # type: ignore[attr-defined]
+            body = b'needle'
+            self.send_response(503)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path.endswith('/large'):
+            # 100 KB page with the needle after the first 10 KB
+            body = b'a' * 10 * 1024 + b'needle' + b'a' * 90 * 1024
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path.startswith('/untyped'):
+            body = b'RIFF\x00\x00\x00\x00WEBP'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path.startswith('/missing'):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'image'
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/webp')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ImageServer(ThreadingHTTPServer):
+
+    def handle_error(self, request, client_address):
+        # fetch_until closes connections with unread content, which isn't an error
+        if not isinstance(sys.exc_info()[1], ConnectionResetError):
+            super().handle_error(request, client_address)
+
+
+class TestSession(unittest.TestCase):
+
+    # Serve images from a local server that supports keep-alive connections
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.server = _ImageServer(('127.0.0.1', 0), _ImageHandler)
+        self.server.client_ports = set()  # type: ignore[attr-defined]
+        self.server.flaky_errors = 0  # type: ignore[attr-defined]
+        self.server.requests = []  # type: ignore[attr-defined]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        self.session = Session()
+        set_image_cache(MemoryCache())
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        logging.disable(logging.NOTSET)
+
+    def test_images_reuse_connection(self):
+        images = [ThumbFramesImage(url='{}/M{}.jpg'.format(self.base_url, i),
+                                   width=10, height=10, cols=1, rows=1, n_frames=1, session=self.session)
+                  for i in range(5)]
+        for image in images:
+            self.assertEqual(image.get_image(), b'image')
+            self.assertEqual(image.mime_type, 'webp')
+
+        # all images were downloaded through the same socket
+        self.assertEqual(len(self.server.client_ports), 1)  # type: ignore[attr-defined]
+
+    def test_images_share_session(self):
+        images = ThumbFramesImageList(url_template=self.base_url + '/M$M.jpg', placeholder='$M',
+                                      frame_width=10, frame_height=10, cols=1, rows=1, total_frames=2,
+                                      session=self.session)
+        self.assertIs(images[0]._session, self.session)
+        self.assertIs(images[1]._session, self.session)
+        self.assertEqual([image.get_image() for image in images], [b'image', b'image'])
+
+    def _make_find(self, chunks_read):
+        def _find(content):
+            chunks_read.append(len(content))
+            return content.find(b'needle') if b'needle' in content else None
+        return lambda: _find
+
+    def test_fetch_until(self):
+        chunks_read = []
+        found = self.session.fetch_until(self.base_url + '/large', self._make_find(chunks_read), chunk_size=1024)
+        self.assertEqual(found, 10 * 1024)
+
+        # stopped reading right after the needle
+        self.assertEqual(len(chunks_read), 11)
+
+        # connection with unread content is not reused
+        self.session.fetch(self.base_url + '/M0.jpg')
+        self.assertEqual(len(self.server.client_ports), 2)  # type: ignore[attr-defined]
+
+    def test_fetch_until_after_retries(self):
+        session = Session(retry_policy=RetryPolicy(max_retries=2, backoff=0))
+        self.server.flaky_errors = 2  # type: ignore[attr-defined]
+        chunks_read = []
+
+        # the error responses' bodies aren't searched
+        found = session.fetch_until(self.base_url + '/flaky/large', self._make_find(chunks_read), chunk_size=1024)
+        self.assertEqual(found, 10 * 1024)
+        self.assertEqual(len(chunks_read), 11)
+        session.close()
+
+    def test_image_without_content_type(self):
+        images = ThumbFramesImageList(url_template=self.base_url + '/untyped/M$M.jpg', placeholder='$M',
+                                      frame_width=10, frame_height=10, cols=1, rows=1, total_frames=2,
+                                      session=self.session)
+        self.assertEqual(download_images(images, max_workers=2), [None, None])
+        self.assertEqual([image.mime_type for image in images], ['webp', 'webp'])
+
+    def test_http_error(self):
+        with self.assertRaises(ExtractorError) as cm:
+            self.session.fetch(self.base_url + '/missing.jpg')
+        self.assertEqual(cm.exception.cause.code, 404)
+
+        # connection is still usable after an error
+        body, headers = self.session.fetch(self.base_url + '/M0.jpg')
+        self.assertEqual(body, b'image')
+        self.assertEqual(len(self.server.client_ports), 1)  # type: ignore[attr-defined]
+
+    def test_retry_server_errors(self):
+        session = Session(retry_policy=RetryPolicy(max_retries=2, backoff=0))
+        self.server.flaky_errors = 2  # type: ignore[attr-defined]
+        body, headers = session.fetch(self.base_url + '/flaky.jpg')
+        self.assertEqual(body, b'image')
+
+        self.server.flaky_errors = 3  # type: ignore[attr-defined]
+        with self.assertRaises(ExtractorError) as cm:
+            session.fetch(self.base_url + '/flaky.jpg')
+        self.assertEqual(cm.exception.cause.code, 503)
+        session.close()
+
+    def test_proxy(self):
+        # the local server works as a proxy, since it ignores the host of the requested URLs
+        session = Session(proxy=self.base_url)
+        body, _ = session.fetch('http://i.ytimg.com/sb/M0.jpg')
+        self.assertEqual(body, b'image')
+        body, _ = asyncio.run(session.async_fetch('http://i.ytimg.com/sb/M1.jpg'))
+        self.assertEqual(body, b'image')
+        self.assertEqual([path for path, _ in self.server.requests],  # type: ignore[attr-defined]
+                         ['http://i.ytimg.com/sb/M0.jpg', 'http://i.ytimg.com/sb/M1.jpg'])
+        session.close()
+
+        with self.assertRaises(ExtractorError):
+            Session(proxy='socks5://127.0.0.1:1080').fetch('http://i.ytimg.com/sb/M0.jpg')
+
+    def test_environment_proxy(self):
+        with mock.patch.dict('os.environ', {'http_proxy': self.base_url, 'no_proxy': 'example.com'}):
+            session = Session()
+            session.fetch('http://i.ytimg.com/sb/M0.jpg')
+            self.assertEqual(self.server.requests[-1][0],  # type: ignore[attr-defined]
+                             'http://i.ytimg.com/sb/M0.jpg')
+            self.assertIsNone(session._get_proxy('http', 'example.com'))
+            session.close()
+
+        # an empty proxy disables the environment's proxies
+        with mock.patch.dict('os.environ', {'http_proxy': 'http://127.0.0.1:1'}):
+            session = Session(proxy='')
+            self.assertEqual(session.fetch(self.base_url + '/M0.jpg')[0], b'image')
+            session.close()
+
+    def test_cookies(self):
+        self.session.downloader.cookiejar.set_cookie(Cookie(
+            0, 'name', 'value', None, False, '127.0.0.1', False, False, '/', False, False, None, False,
+            None, None, {}))
+        self.session.fetch(self.base_url + '/M0.jpg')
+        asyncio.run(self.session.async_fetch(self.base_url + '/M1.jpg'))
+        self.assertEqual([cookie for _, cookie in self.server.requests],  # type: ignore[attr-defined]
+                         ['name=value', 'name=value'])
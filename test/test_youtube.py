@@ -1,15 +1,27 @@
 import re
 import os
 import logging
+import tempfile
 import unittest
 
 import httpretty  # type: ignore
+import numpy as np
 
+from io import BytesIO
 from numbers import Number
+from PIL import Image
+from unittest import mock
 from urllib.parse import urlparse
 
 from youtube_dl.utils import ExtractorError
-from thumbframes_dl import YouTubeFrames
+from thumbframes_dl import DiskCache, MemoryCache, Session, YouTubeFrames, get_image_cache, set_image_cache
+from thumbframes_dl.cache import url_cache_key
+from thumbframes_dl.ratelimit import RetryPolicy, TokenBucket
+from thumbframes_dl.scenes import detect_scenes
+from thumbframes_dl.extractors.base import ThumbFramesFormat, ThumbFramesImage, ThumbFramesImageList, download_images
+from thumbframes_dl.extractors.youtube import _SpecSearch
+
+from .sheets import frame_color, make_sheet, make_thumbframes
 
 
 TEST_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -27,6 +39,7 @@ class TestYouTubeFrames(unittest.TestCase):
 
         httpretty.reset()
         httpretty.enable(allow_net_connect=False)
+        set_image_cache(MemoryCache())
 
         # main video page
         video_path = 'www_youtube_com_WhWc3b3KhnY.html'
@@ -99,11 +112,143 @@ class TestYouTubeFrames(unittest.TestCase):
         self.assertEqual(video.video_id, self.VIDEO_ID)
         self.assertEqual(video.video_url, self.VIDEO_URL)
 
+    def test_lazy_init(self):
+        video = YouTubeFrames(self.VIDEO_URL, lazy=True)
+        self.assertEqual(video.video_id, self.VIDEO_ID)
+        self.assertEqual(video.video_url, self.VIDEO_URL)
+
+        # nothing is downloaded until the thumbframes are needed
+        self.assertEqual(len(httpretty.latest_requests()), 0)
+        self.assertEqual(len(video.thumbframe_formats), 3)
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+
+        # and then they're only downloaded once
+        self.assertIsNotNone(video.get_thumbframes('L1'))
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+
+    def test_prefetch(self):
+        video = YouTubeFrames(self.VIDEO_ID, lazy=True)
+        video.prefetch()
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+
+        video.prefetch()
+        self.assertEqual(len(video.get_thumbframes('L2')), 4)
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+
+    def test_fail_lazy_init_with_bad_url(self):
+        with self.assertRaises(ExtractorError):
+            _ = YouTubeFrames('BAD_URL', lazy=True)
+
     def test_fail_init_with_bad_url(self):
         BAD_URL = 'BAD_URL'
         with self.assertRaises(ExtractorError):
             _ = YouTubeFrames(BAD_URL)
 
+    def test_from_many(self):
+        urls = [self.VIDEO_ID, 'BAD_URL', self.VIDEO_URL]
+        with mock.patch('thumbframes_dl.extractors.base.frames.TokenBucket', wraps=TokenBucket) as bucket_class:
+            results = list(YouTubeFrames.from_many(urls, max_workers=2, rate_limit=100))
+        # videos are started one at a time, unless a bigger burst is allowed
+        bucket_class.assert_called_once_with(100, capacity=1)
+
+        # one result per URL, even if one of them failed
+        self.assertEqual(sorted(result.url for result in results), sorted(urls))
+        for result in results:
+            if result.url == 'BAD_URL':
+                self.assertFalse(result.ok)
+                self.assertIsNone(result.video)
+                self.assertIsInstance(result.error, ExtractorError)
+            else:
+                self.assertTrue(result.ok)
+                self.assertEqual(result.video.video_id, self.VIDEO_ID)
+                self.assertEqual(len(result.video.thumbframe_formats), 3)
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            session = Session(cache=DiskCache(tmp_dir))
+            video = YouTubeFrames(self.VIDEO_ID, session=session)
+            for tf_image in video.get_thumbframes('L2'):
+                self.assertIsNotNone(tf_image.get_image())
+            number_of_requests = len(httpretty.latest_requests())
+
+            # a new video object with the same cache doesn't download anything, even in a new process
+            get_image_cache().clear()
+            same_video = YouTubeFrames(self.VIDEO_ID, session=Session(cache=DiskCache(tmp_dir)))
+            self.assertEqual(len(same_video.thumbframe_formats), 3)
+            for tf_image in same_video.get_thumbframes('L2'):
+                self.assertIsNotNone(tf_image.get_image())
+                self.assertEqual(tf_image.mime_type, 'webp')
+            self.assertEqual(len(httpretty.latest_requests()), number_of_requests)
+            self.assertEqual(same_video._session.cache.hits, len(same_video.get_thumbframes('L2')) + 1)
+
+    def test_stale_cached_spec_is_removed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            session = Session(cache=DiskCache(tmp_dir))
+            YouTubeFrames(self.VIDEO_ID, session=session)
+            cache_key = 'YouTubeFrames:{}:storyboards'.format(self.VIDEO_ID)
+            self.assertIsNotNone(session.cache.get(cache_key))
+
+            # the cached spec's signatures expired, so its images are forbidden
+            with open(os.path.join(TEST_DIR, 'test_assets', 'www_youtube_com_WhWc3b3KhnY.html')) as f:
+                video_page = f.read()
+            httpretty.reset()
+            httpretty.register_uri(httpretty.GET, self.VIDEO_URL, body=video_page)
+            httpretty.register_uri(httpretty.GET, re.compile(r'^.*\.jpg$'), status=403)
+            video = YouTubeFrames(self.VIDEO_ID, session=session)
+            with self.assertRaises(ExtractorError):
+                video.get_thumbframes('L2', lazy=False)
+            self.assertIsNone(session.cache.get(cache_key))
+
+            # a spec that was just downloaded isn't removed
+            video = YouTubeFrames(self.VIDEO_ID, session=session)
+            with self.assertRaises(ExtractorError):
+                list(video.iter_thumbframes('L2'))
+            self.assertIsNotNone(session.cache.get(cache_key))
+
+    def test_fetch_strategy_api(self):
+        with open(os.path.join(TEST_DIR, 'test_assets', 'www_youtube_com_WhWc3b3KhnY.html')) as f:
+            player_response = re.search(r'ytInitialPlayerResponse = ({.+?});var meta', f.read()).group(1)
+        httpretty.reset()
+        httpretty.register_uri(httpretty.POST, 'https://www.youtube.com/youtubei/v1/player', body=player_response)
+
+        video = YouTubeFrames(self.VIDEO_ID, fetch_strategy=YouTubeFrames.FETCH_API)
+        self.assertEqual(len(video.thumbframe_formats), 3)
+
+        # page wasn't downloaded
+        self.assertNotIn('GET', [request.method for request in httpretty.latest_requests()])
+
+    def test_fetch_strategy_api_falls_back_to_page(self):
+        video = YouTubeFrames(self.VIDEO_ID, fetch_strategy=YouTubeFrames.FETCH_API)
+        self.assertEqual(len(video.thumbframe_formats), 3)
+        self.assertEqual(httpretty.last_request().method, 'GET')
+
+    def test_fetch_strategy_stream(self):
+        video = YouTubeFrames(self.VIDEO_ID, fetch_strategy=YouTubeFrames.FETCH_STREAM)
+        self.assertEqual(len(video.thumbframe_formats), 3)
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+        self.assertEqual(video.get_thumbframe_format('L2').total_frames, 94)
+
+    def test_find_spec_in_incomplete_webpage(self):
+        with open(os.path.join(TEST_DIR, 'test_assets', 'www_youtube_com_WhWc3b3KhnY.html'), 'rb') as f:
+            webpage = f.read()
+        video = YouTubeFrames(self.VIDEO_ID, lazy=True)
+        expected = video._find_spec_in_webpage(webpage, complete=True)
+        self.assertTrue(expected[0])
+
+        # one byte at a time, so the spec and the player response's boundaries get split at every offset
+        search = _SpecSearch()
+        for length in range(len(webpage) + 1):
+            found = video._find_spec_in_webpage(webpage[:length], False, search)
+            if found is not None:
+                break
+        self.assertEqual(found, expected)
+        self.assertLess(length, len(webpage))
+        self.assertGreater(search.spec_offset, search.start)
+
+    def test_fail_init_with_bad_fetch_strategy(self):
+        with self.assertRaises(ValueError):
+            _ = YouTubeFrames(self.VIDEO_ID, fetch_strategy='BAD_STRATEGY')
+
     def test_thumbframes_not_found(self):
         # mock responses with no thumbframes
         httpretty.reset()
@@ -136,6 +281,18 @@ class TestYouTubeFrames(unittest.TestCase):
         # should NOT re-try download even if thumbframes info is empty
         self.assertEqual(len(httpretty.latest_requests()), number_of_requests)
 
+    def test_retry_throttled_page(self):
+        with open(os.path.join(TEST_DIR, 'test_assets', 'www_youtube_com_WhWc3b3KhnY.html')) as f:
+            video_page = f.read()
+        httpretty.register_uri(httpretty.GET, self.VIDEO_URL,
+                               responses=[httpretty.Response(body='', status=429),
+                                          httpretty.Response(body=video_page)])
+
+        session = Session(retry_policy=RetryPolicy(max_retries=1, backoff=0))
+        video = YouTubeFrames(self.VIDEO_ID, session=session)
+        self.assertEqual(len(video.thumbframe_formats), 3)
+        self.assertEqual(len(httpretty.latest_requests()), 2)
+
     def test_page_only_downloads_once(self):
         video = YouTubeFrames(self.VIDEO_ID)
 
@@ -182,6 +339,69 @@ class TestYouTubeFrames(unittest.TestCase):
             self.assertIsNotNone(tf_image.get_image())
         self.assertEqual(len(httpretty.latest_requests()), len(thumbframes) + 1)
 
+    def test_iter_thumbframes(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        httpretty.reset()
+        httpretty.register_uri(httpretty.GET, re.compile(r'^.*M(\d)\.jpg.*$'),
+                               body=lambda request, uri, headers: (200, headers, urlparse(uri).path.encode()))
+
+        streamed = list(video.iter_thumbframes('L2', prefetch=2))
+        self.assertEqual([tf_image.url for tf_image, _ in streamed],
+                         [tf_image.url for tf_image in video.get_thumbframes('L2')])
+        for tf_image, raw_image in streamed:
+            self.assertEqual(raw_image, urlparse(tf_image.url).path.encode())
+            # raw images aren't kept after being yielded
+            self.assertIsNone(get_image_cache().get(url_cache_key(tf_image.url)))
+
+        for tf_image, raw_image in video.iter_thumbframes('L2', keep=True):
+            self.assertIs(get_image_cache().get(url_cache_key(tf_image.url)), raw_image)
+
+    def test_image_cache_is_bounded(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        thumbframes = video.get_thumbframes('L2')
+        image_size = len(thumbframes[0].get_image())
+        set_image_cache(MemoryCache(max_size=image_size * 2))
+
+        # only the last 2 images fit in the cache, so the first one is downloaded again
+        for tf_image in thumbframes:
+            tf_image.get_image()
+        self.assertEqual(get_image_cache().size, image_size * 2)
+        self.assertEqual(get_image_cache().evictions, len(thumbframes) - 2)
+        thumbframes[-1].get_image()
+        self.assertEqual(len(httpretty.latest_requests()), len(thumbframes) + 2)
+        thumbframes[0].get_image()
+        self.assertEqual(len(httpretty.latest_requests()), len(thumbframes) + 3)
+
+    def test_non_lazy_thumbframes_in_parallel(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+
+        # same number of downloads as in serial mode, but made by a pool of threads
+        thumbframes = video.get_thumbframes('L2', lazy=False, max_workers=4)
+        self.assertEqual(len(httpretty.latest_requests()), len(thumbframes) + 1)
+
+        # results keep the same order as the images list
+        self.assertEqual(thumbframes, video.get_thumbframes('L2'))
+        for tf_image in thumbframes:
+            self.assertIsNotNone(get_image_cache().get(url_cache_key(tf_image.url)))
+
+    def test_non_lazy_thumbframes_with_failed_image(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        thumbframes = video.get_thumbframes('L2')
+        httpretty.reset()
+        httpretty.register_uri(httpretty.GET, re.compile(r'^.*/M1\.jpg$'), status=404)
+        httpretty.register_uri(httpretty.GET, re.compile(r'^.*/M[023]\.jpg$'), body=b'image')
+
+        with self.assertRaises(ExtractorError):
+            video.get_thumbframes('L2', lazy=False, max_workers=4)
+
+        # one failed image doesn't stop the others from being downloaded
+        self.assertEqual(len(httpretty.latest_requests()), len(thumbframes))
+        errors = download_images(thumbframes)
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], ExtractorError)
+        self.assertIsNone(errors[2])
+        self.assertIsNone(errors[3])
+
     # Test that internal _thumbframes dict is set correctly.
     def test_get_thumbframes_info(self):
 
@@ -221,6 +441,313 @@ class TestYouTubeFrames(unittest.TestCase):
         self.assertEqual(video.thumbframe_formats[2].total_frames, 100)
         self.assertEqual(video.thumbframe_formats[2].total_images, 1)
 
+    def test_thumbframes_are_generated_from_spec(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+
+        # formats are computed without creating any image
+        self.assertEqual(len(video.thumbframe_formats), 3)
+        self.assertIsNone(video._thumbframes['L2']._images)
+
+        images = video._thumbframes['L2']
+        self.assertIsInstance(images, ThumbFramesImageList)
+        self.assertEqual(urlparse(images[3].url).path, '/sb/WhWc3b3KhnY/storyboard3_L2/M3.jpg')
+        self.assertTrue(images[3].url.endswith('&sigh=' + images.get_url(0).split('&sigh=')[1]))
+        self.assertIs(images[3], images[-1])
+        self.assertFalse(hasattr(images[3], '__dict__'))
+
+    def test_last_image_of_non_square_grid(self):
+        # 23 frames in 5x3 grids: the last image has 8 frames in 2 rows
+        images = ThumbFramesImageList(url_template='https://i.ytimg.com/sb/test/M$M.jpg?sqp=a&', placeholder='$M',
+                                      url_suffix='sigh=rs$M', frame_width=10, frame_height=5,
+                                      cols=5, rows=3, total_frames=23)
+        self.assertEqual(len(images), 2)
+        self.assertEqual((images[0].cols, images[0].rows, images[0].n_frames), (5, 3, 15))
+        self.assertEqual((images[1].cols, images[1].rows, images[1].n_frames), (5, 2, 8))
+        self.assertEqual((images[1].width, images[1].height), (50, 10))
+        self.assertEqual(images[1].url, 'https://i.ytimg.com/sb/test/M1.jpg?sqp=a&sigh=rs$M')
+
+    def test_serialize_and_restore(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        data = video.to_bytes()
+        httpretty.reset()
+
+        restored = YouTubeFrames.from_bytes(data)
+        self.assertEqual(restored.video_id, self.VIDEO_ID)
+        self.assertEqual(restored.duration, video.duration)
+        self.assertEqual(restored.to_dict(), video.to_dict())
+        self.assertEqual([tf_format.to_dict() for tf_format in restored.thumbframe_formats],
+                         [tf_format.to_dict() for tf_format in video.thumbframe_formats])
+        self.assertEqual([tf_image.url for tf_image in restored.get_thumbframes('L2')],
+                         [tf_image.url for tf_image in video.get_thumbframes('L2')])
+
+        # restoring a video doesn't download its page
+        self.assertEqual(len(httpretty.latest_requests()), 0)
+
+    def test_serialize_format_and_image(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        tf_format = video.get_thumbframe_format('L2')
+        restored_format = ThumbFramesFormat.from_dict(tf_format.to_dict())
+        self.assertEqual(restored_format.format_id, 'L2')
+        self.assertEqual(restored_format.get_frame_position(100), tf_format.get_frame_position(100))
+
+        tf_image = video.get_thumbframes('L2')[3]
+        restored_image = ThumbFramesImage.from_dict(tf_image.to_dict())
+        self.assertEqual(restored_image.to_dict(), tf_image.to_dict())
+        self.assertEqual(restored_image.get_image(), tf_image.get_image())
+
+    def test_select_thumbframe_format(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        # the last image only has 4 of its 5 rows
+        self.assertEqual(video.get_thumbframe_format('L2').total_pixels, (3 * 25 + 4 * 5) * 214 * 90)
+        self.assertEqual(video.get_thumbframe_format('L1').total_pixels, 100 * 107 * 45)
+
+        # cheapest format is the smallest one, unless it's not good enough
+        self.assertEqual(video.select_thumbframe_format().format_id, 'L0')
+        self.assertEqual(video.select_thumbframe_format(min_frame_width=100).format_id, 'L1')
+        self.assertEqual(video.select_thumbframe_format(min_frame_width=100, min_frame_height=90).format_id, 'L2')
+        self.assertEqual(video.select_thumbframe_format(min_frame_width=40, min_frames=95).format_id, 'L0')
+
+        # falls back to the highest resolution
+        self.assertEqual(video.select_thumbframe_format(min_frame_width=1000).format_id, 'L2')
+
+    def test_thumbframes_formats_are_memoized(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+
+        # formats are computed only once
+        self.assertIs(video.thumbframe_formats, video.thumbframe_formats)
+        self.assertIs(video.get_thumbframe_format('L1'), video.thumbframe_formats[1])
+        self.assertIs(video.get_thumbframe_format(), video.thumbframe_formats[0])
+        self.assertIsNone(video.get_thumbframe_format('L9'))
+
+        # but they're computed again if thumbframes change
+        video._thumbframes = {'L0': video._thumbframes['L0']}
+        self.assertEqual(len(video.thumbframe_formats), 1)
+        self.assertEqual(video.get_thumbframe_format().format_id, 'L0')
+        self.assertIsNone(video.get_thumbframe_format('L1'))
+
+    def test_iter_frames(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        video._thumbframes = {'L2': make_thumbframes(214, 90, cols=5, rows=5, total_frames=94)}
+
+        frames = list(video.iter_frames())
+        self.assertEqual(len(frames), 94)
+        for i, frame in enumerate(frames):
+            self.assertEqual(frame.shape, (90, 214, 3))
+            self.assertEqual(tuple(frame[0, 0]), frame_color(i))
+
+    def test_get_frames_array(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        video._thumbframes = {'L2': make_thumbframes(214, 90, cols=5, rows=5, total_frames=94)}
+
+        frames = video.get_frames_array(max_workers=4)
+        self.assertEqual(frames.shape, (94, 90, 214, 3))
+        self.assertEqual(frames.dtype, np.uint8)
+        for i in range(94):
+            self.assertTrue((frames[i] == frame_color(i)).all())
+
+    def test_get_frames_array_memory_mapped(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        video._thumbframes = {'L2': make_thumbframes(214, 90, cols=5, rows=5, total_frames=94)}
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mmap_path = os.path.join(tmp_dir, 'frames.npy')
+            frames = video.get_frames_array(mmap_path=mmap_path)
+            self.assertIsInstance(frames, np.memmap)
+
+            saved_frames = np.load(mmap_path)
+            self.assertEqual(saved_frames.shape, (94, 90, 214, 3))
+            self.assertTrue((saved_frames[93] == frame_color(93)).all())
+            del frames, saved_frames
+
+    def test_duration_estimated_from_thumbframes(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+
+        # page doesn't have the video's details, but L1 and L2 have 94 frames every 5 seconds
+        self.assertEqual(video.duration, 470)
+        self.assertEqual(video.get_thumbframe_format('L2').frame_interval, 5)
+        self.assertEqual(video.get_thumbframe_format('L0').frame_interval, 4.7)
+
+    def test_duration_from_video_details(self):
+        with open(os.path.join(TEST_DIR, 'test_assets', 'www_youtube_com_WhWc3b3KhnY.html')) as f:
+            video_page = f.read().replace('var ytInitialPlayerResponse = {',
+                                          'var ytInitialPlayerResponse = {"videoDetails":{"lengthSeconds":"464"},')
+        httpretty.register_uri(httpretty.GET, self.VIDEO_URL, body=video_page)
+
+        video = YouTubeFrames(self.VIDEO_ID)
+        self.assertEqual(video.duration, 464)
+        self.assertEqual(video.get_thumbframe_format('L0').frame_interval, 4.64)
+
+    def test_get_frame_position(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+
+        # 5:13 is the 63rd frame, in the 3rd image of L2
+        tf_image, row, col = video.get_frame_position(5 * 60 + 13, 'L2')
+        self.assertIs(tf_image, video.get_thumbframes('L2')[2])
+        self.assertEqual((row, col), (2, 2))
+        self.assertEqual(video.get_thumbframe_format('L2').get_frame_index(5 * 60 + 13), 62)
+
+        # timestamps out of the video's bounds return the first or last frames
+        tf_image, row, col = video.get_frame_position(-1, 'L2')
+        self.assertEqual((video.get_thumbframes('L2').index(tf_image), row, col), (0, 0, 0))
+        tf_image, row, col = video.get_frame_position(10 * 60, 'L2')
+        self.assertEqual((video.get_thumbframes('L2').index(tf_image), row, col), (3, 3, 3))
+
+        # no image was downloaded
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+
+    def test_get_frame_at(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+
+        # replace images with real images with 5x5 frames of 214x90
+        httpretty.reset()
+        httpretty.register_uri(httpretty.GET, re.compile('^.*jpg$'), body=make_sheet(214, 90, 5, 5, 25),
+                               forcing_headers={'Content-Type': 'image/png'})
+
+        frame = video.get_frame_at(5 * 60 + 13, 'L2')
+        self.assertEqual(frame.shape, (90, 214, 3))
+        self.assertEqual(tuple(frame[0, 0]), frame_color(12))
+
+        # only the image with the frame was downloaded
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+        self.assertIn('M2.jpg', httpretty.last_request().path)
+
+    def test_get_sampled_frames(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        httpretty.reset()
+        httpretty.register_uri(httpretty.GET, re.compile('^.*jpg$'), body=make_sheet(214, 90, 5, 5, 25),
+                               forcing_headers={'Content-Type': 'image/png'})
+
+        # 94 frames of L2 sampled at frames 23 and 70, which are in the first and third images
+        frames = video.get_sampled_frames(n_samples=2, min_frame_width=200)
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0].shape, (90, 214, 3))
+        self.assertEqual(tuple(frames[0][0, 0]), frame_color(23))
+        self.assertEqual(tuple(frames[1][0, 0]), frame_color(70 - 50))
+        self.assertEqual(sorted(urlparse(request.path).path.rsplit('/', 1)[1] for request
+                                in httpretty.latest_requests()), ['M0.jpg', 'M2.jpg'])
+
+    def test_get_sample_positions(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+
+        # all the samples fit in the single image of L1
+        positions = video.get_sample_positions(n_samples=20, min_frame_width=100)
+        self.assertEqual(len(positions), 20)
+        self.assertEqual({tf_image for tf_image, _, _ in positions}, {video.get_thumbframes('L1')[0]})
+
+        # samples at timestamps are the same frames found by get_frame_position
+        positions = video.get_sample_positions(timestamps=[0, 5 * 60 + 13], format_id='L2')
+        self.assertEqual(positions[1], video.get_frame_position(5 * 60 + 13, 'L2'))
+        self.assertEqual(positions[0], (video.get_thumbframes('L2')[0], 0, 0))
+
+        with self.assertRaises(ValueError):
+            video.get_sample_positions()
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+
+    def test_get_scene_changes(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        thumbframes = make_thumbframes(214, 90, cols=5, rows=5, total_frames=94)
+        video._thumbframes = {'L2': thumbframes}
+        self.assertIsNone(video.get_scene_changes())
+
+        for tf_image in thumbframes:
+            tf_image.frame_interval = 2.0
+        video._thumbframes = {'L2': thumbframes}
+        cuts = detect_scenes(video.get_frames_array(), method='pixel', threshold=0.05)
+        self.assertTrue(len(cuts))
+        self.assertEqual(video.get_scene_changes(method='pixel', threshold=0.05), [cut * 2.0 for cut in cuts])
+
+    def test_save_preview(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        video._thumbframes = {'L2': make_thumbframes(214, 90, cols=5, rows=5, total_frames=94)}
+
+        for image_format in ('WEBP', 'GIF'):
+            output = BytesIO()
+            video.save_preview(output, image_format=image_format, fps=5, step=3)
+            with Image.open(output) as preview:
+                self.assertEqual(preview.format, image_format)
+                self.assertEqual(preview.size, (214, 90))
+                self.assertEqual(preview.n_frames, 32)
+                preview.seek(1)
+                preview.load()
+                self.assertEqual(preview.info['duration'], 200)
+
+        # frames can be resized
+        output = BytesIO()
+        video.save_preview(output, size=(107, 45))
+        with Image.open(output) as preview:
+            self.assertEqual(preview.size, (107, 45))
+            self.assertEqual(preview.n_frames, 94)
+
+        video._thumbframes = {}
+        with self.assertRaises(ExtractorError):
+            video.save_preview(BytesIO())
+
+    def test_build_atlas(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        video._thumbframes = {'L2': make_thumbframes(214, 90, cols=5, rows=5, total_frames=94)}
+
+        # 94 frames from sheets with 5x5 grids in a single 10x10 atlas
+        atlas = video.build_atlas(cols=10)
+        self.assertEqual(len(atlas.images), 1)
+        self.assertEqual(atlas.images[0].shape, (10 * 90, 10 * 214, 3))
+        _, x, y, width, height = atlas.get_frame_box(93)
+        self.assertTrue((atlas.images[0][y:y + height, x:x + width] == frame_color(93)).all())
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = video.build_atlas(cols=10, rows=4).save(os.path.join(tmp_dir, 'atlas_{index}.png'))
+            self.assertEqual(len(paths), 3)
+            with Image.open(paths[2]) as last_atlas:
+                self.assertEqual(last_atlas.size, (10 * 214, 2 * 90))
+
+    def test_get_webvtt(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        images = video._thumbframes['L2']
+        webvtt = video.get_webvtt('L2')
+
+        cues = webvtt.rstrip('\n').split('\n\n')[1:]
+        self.assertTrue(webvtt.startswith('WEBVTT\n\n'))
+        self.assertEqual(len(cues), 94)
+        self.assertEqual(cues[0], '00:00:00.000 --> 00:00:05.000\n{}#xywh=0,0,214,90'.format(images.get_url(0)))
+        self.assertEqual(cues[32], '00:02:40.000 --> 00:02:45.000\n{}#xywh=428,90,214,90'.format(images.get_url(1)))
+
+        # made without downloading any image, nor creating any ThumbFramesImage
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+        self.assertIsNone(images._images)
+        self.assertIsNone(video.get_webvtt('L9'))
+
+    def test_get_signature(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        httpretty.reset()
+        httpretty.register_uri(httpretty.GET, re.compile('^.*jpg$'), body=make_sheet(48, 27, 10, 10, 100),
+                               forcing_headers={'Content-Type': 'image/png'})
+
+        # the whole video is hashed from the single image of L0
+        hashes = video.get_frame_hashes()
+        self.assertEqual(hashes.shape, (100,))
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+        self.assertIn('storyboard3_L0', httpretty.last_request().path)
+
+        signature = video.get_signature(length=16)
+        self.assertEqual(len(signature), 16 * 8)
+        self.assertEqual(len(httpretty.latest_requests()), 1)
+
+        with self.assertRaises(ValueError):
+            video.get_frame_hashes(method='phash')
+
+    def test_frames_are_decoded_from_downloaded_images(self):
+        video = YouTubeFrames(self.VIDEO_ID)
+        httpretty.reset()
+        httpretty.register_uri(httpretty.GET, re.compile('^.*jpg$'), body=make_sheet(214, 90, 5, 5, 25),
+                               forcing_headers={'Content-Type': 'image/png'})
+        # no image fits in the cache, but each one is still downloaded only once
+        set_image_cache(MemoryCache(max_size=1))
+
+        self.assertEqual(video.get_frame_hashes('L2', max_workers=2).shape, (94,))
+        self.assertEqual(len(httpretty.latest_requests()), 4)
+
+        self.assertEqual(len(video.get_sampled_frames(n_samples=3, format_id='L2')), 3)
+        self.assertEqual(len(httpretty.latest_requests()), 4 + 3)
+
     def test_get_thumbframes_default_to_best_format(self):
         video = YouTubeFrames(self.VIDEO_ID)
 
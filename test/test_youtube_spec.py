@@ -0,0 +1,50 @@
+import logging
+import unittest
+
+from thumbframes_dl.extractors.youtube_spec import StoryboardSpec
+
+
+BASE_URL = 'https://i.ytimg.com/sb/test/storyboard3_L$L/$N.jpg?sqp=abc'
+
+
+class TestStoryboardSpec(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def test_parse_levels(self):
+        spec = StoryboardSpec(BASE_URL + '|48#27#100#10#10#0#default#rs$A|80#45#94#10#10#2000#M$M#rs$B')
+        self.assertEqual([level.format_id for level in spec.levels], ['L0', 'L1'])
+
+        level = spec.levels[1]
+        self.assertEqual((level.frame_width, level.frame_height, level.total_frames), (80, 45, 94))
+        self.assertEqual(level.get_frame_interval(), 2.0)
+        self.assertEqual(spec.estimated_duration, 188.0)
+
+        # levels without an interval spread their frames across the whole video
+        self.assertIsNone(spec.levels[0].get_frame_interval())
+        self.assertEqual(spec.levels[0].get_frame_interval(188.0), 1.88)
+
+        images = level.to_image_list()
+        self.assertEqual(images.get_url(3), 'https://i.ytimg.com/sb/test/storyboard3_L1/M3.jpg?sqp=abc&sigh=rs$B')
+        self.assertEqual(spec.levels[0].to_image_list().get_url(0),
+                         'https://i.ytimg.com/sb/test/storyboard3_L0/default.jpg?sqp=abc&sigh=rs$A')
+
+    def test_non_square_grids(self):
+        # 23 frames in 5x3 grids and 7 frames in 3x4 grids
+        spec = StoryboardSpec(BASE_URL + '|10#5#23#5#3#1000#M$M#rs$A|10#5#7#3#4#1000#M$M#rs$B')
+        images = spec.levels[0].to_image_list()
+        self.assertEqual(len(images), 2)
+        self.assertEqual(images.get_grid(0), (5, 3, 15))
+        self.assertEqual(images.get_grid(1), (5, 2, 8))
+
+        images = spec.levels[1].to_image_list()
+        self.assertEqual(len(images), 1)
+        self.assertEqual(images.get_grid(0), (3, 3, 7))
+        self.assertIsNone(images._images)
+
+    def test_skip_invalid_levels(self):
+        spec = StoryboardSpec(BASE_URL + '|48#27#100#10#10#0#default|0#45#94#10#10#2000#M$M#rs$B'
+                                         '|80#45#94#10#10#2000#M$M#rs$C')
+        self.assertEqual([level.format_id for level in spec.levels], ['L2'])
+        self.assertIsNone(StoryboardSpec(BASE_URL).estimated_duration)
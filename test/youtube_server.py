@@ -0,0 +1,106 @@
+import os
+import re
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from thumbframes_dl import YouTubeFrames
+
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+IMAGE = (b'RIFF$\x00\x00\x00WEBPVP8 '
+         b'\x18\x00\x00\x000\x01\x00\x9d\x01*'
+         b'\x01\x00\x01\x00\x0f\xc0\xfe%\xa4\x00\x03p\x00\xfe\xe6\xb5\x00\x00')
+
+
+class _YouTubeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: 'YouTubeServer'
+
+    def _send(self, body: bytes, content_type: str, chunked: bool = False) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        if chunked:
+            # split body in 2 chunks to test clients that read chunked responses
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            half = len(body) // 2
+            for chunk in (body[:half], body[half:], b''):
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.count_request(self.path)
+        path = urlsplit(self.path).path
+        if path == '/watch':
+            self._send(self.server.video_page, 'text/html; charset=utf-8')
+        elif path.startswith('/sb/'):
+            self._send(self.server.image, 'image/webp', chunked=True)
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def do_POST(self):
+        self.server.count_request(self.path)
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._send(self.server.player_response, 'application/json')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class YouTubeServer(ThreadingHTTPServer):
+    """
+    Local stand-in for YouTube that serves the recorded test assets,
+    with the storyboards' URLs pointing back to this same server.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, image: bytes = IMAGE):
+        super().__init__(('127.0.0.1', 0), _YouTubeHandler)
+        self.base_url = 'http://127.0.0.1:{}'.format(self.server_address[1])
+        self.image = image
+        self.requests: list[str] = []
+        self._requests_lock = threading.Lock()
+
+        with open(os.path.join(TEST_DIR, 'test_assets', 'www_youtube_com_WhWc3b3KhnY.html')) as f:
+            video_page = f.read()
+        self.video_page = video_page.replace('https://i.ytimg.com', self.base_url) \
+                                    .replace('https:\\/\\/i.ytimg.com', self.base_url.replace('/', '\\/')) \
+                                    .encode('utf-8')
+
+        # the player API returns the same player response that's embedded in the page
+        match = re.search(rb'ytInitialPlayerResponse = ({.+?});var meta', self.video_page)
+        assert match is not None
+        self.player_response = match.group(1)
+
+        base_url = self.base_url
+
+        # YouTubeFrames that downloads everything from this server
+        class LocalYouTubeFrames(YouTubeFrames):
+            _VIDEO_WEBPAGE_URL = base_url + '/watch?v={VIDEO_ID}'
+
+            def _get_api_request(self, ep, query):
+                url, data, headers = super()._get_api_request(ep, query)
+                return url.replace('https://www.youtube.com', base_url), data, headers
+
+        self.YouTubeFrames = LocalYouTubeFrames
+
+    def count_request(self, path: str) -> None:
+        with self._requests_lock:
+            self.requests.append(path)
+
+    def start(self) -> 'YouTubeServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
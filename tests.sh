@@ -2,7 +2,7 @@ EXIT_CODE=0
 trap "EXIT_CODE=1;" ERR
 
 python -m unittest
-flake8 setup.py test thumbframes_dl
-mypy thumbframes_dl test
+flake8 setup.py test thumbframes_dl benchmarks
+mypy thumbframes_dl test benchmarks
 
 exit $EXIT_CODE
@@ -1,4 +1,7 @@
 # flake8: noqa F401
 from .extractors import *  # noqa: F403
+from .cache import DiskCache, MemoryCache, get_image_cache, set_image_cache
+from .ratelimit import RetryPolicy
+from .session import Session
 from .utils import logger, ExtractorError
 from .version import __version__
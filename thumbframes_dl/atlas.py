@@ -0,0 +1,139 @@
+"""
+Sprite atlases that re-tile all the frames of a format in a uniform grid,
+so a video's frames can be served as one image (or a few images of a fixed size) with an index of their positions.
+This module requires numpy, and Pillow to save the atlases.
+"""
+import json
+import math
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from thumbframes_dl.imaging import import_numpy, import_pil_image
+from thumbframes_dl.webvtt import frame_url, make_webvtt
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class SpriteAtlas(object):
+    """
+    The frames of a video arranged in one or more atlases, each one a numpy array with a cols*rows grid of frames.
+    All the atlases have the same grid, except the last one, which only has the rows it needs.
+    If known, frame_interval is the number of seconds of video between each frame and the next one,
+    which is needed for the WebVTT index.
+    """
+
+    def __init__(self, images: Sequence['np.ndarray'], frame_width: int, frame_height: int, cols: int, rows: int,
+                 total_frames: int, frame_interval: Optional[float] = None):
+        self.images = list(images)
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.cols = cols
+        self.rows = rows
+        self.total_frames = total_frames
+        self.frame_interval = frame_interval
+
+    @classmethod
+    def from_frames(cls, frames: 'np.ndarray', cols: int = 10, rows: Optional[int] = None,
+                    frame_interval: Optional[float] = None) -> 'SpriteAtlas':
+        """
+        Arrange an array of frames with shape (n_frames, frame_height, frame_width, channels), like the one
+        returned by WebsiteFrames.get_frames_array, in atlases with cols*rows frames each.
+        If rows is None, all the frames are put in a single atlas.
+        Each atlas is made with a single bulk copy of its frames.
+        """
+        numpy = import_numpy()
+        if cols < 1 or (rows is not None and rows < 1):
+            raise ValueError('cols and rows must be at least 1')
+        total_frames, frame_height, frame_width, channels = frames.shape
+        rows = rows or max(1, int(math.ceil(total_frames / float(cols))))
+
+        images = []
+        for first_frame in range(0, total_frames, cols * rows):
+            atlas_frames = frames[first_frame:first_frame + cols * rows]
+            atlas_rows = int(math.ceil(len(atlas_frames) / float(cols)))
+            if len(atlas_frames) < atlas_rows * cols:
+                padding = numpy.zeros((atlas_rows * cols - len(atlas_frames),) + atlas_frames.shape[1:],
+                                      dtype=frames.dtype)
+                atlas_frames = numpy.concatenate([atlas_frames, padding])
+            grid = atlas_frames.reshape(atlas_rows, cols, frame_height, frame_width, channels).transpose(0, 2, 1, 3, 4)
+            images.append(grid.reshape(atlas_rows * frame_height, cols * frame_width, channels))
+        return cls(images, frame_width, frame_height, cols, rows, total_frames, frame_interval)
+
+    def get_frame_box(self, frame_index: int) -> tuple[int, int, int, int, int]:
+        """
+        Position of the frame with frame_index as a tuple of (atlas index, x, y, width, height), in pixels.
+
+        :raises IndexError if there's no frame with that index
+        """
+        if not 0 <= frame_index < self.total_frames:
+            raise IndexError('There is no frame {} in {}'.format(frame_index, self))
+        atlas_index, index_in_atlas = divmod(frame_index, self.cols * self.rows)
+        row, col = divmod(index_in_atlas, self.cols)
+        return atlas_index, col * self.frame_width, row * self.frame_height, self.frame_width, self.frame_height
+
+    def save(self, path_template: str = 'atlas_{index}.jpg', image_format: Optional[str] = None, **options
+             ) -> list[str]:
+        """
+        Save each atlas in path_template formatted with the atlas' index, like atlas_0.jpg.
+        The image format is guessed from the file extension unless image_format is set,
+        and any other keyword arguments, like quality, are passed to Pillow's encoder.
+        Returns the paths of the saved atlases.
+        """
+        Image = import_pil_image()
+        paths = []
+        for index, image in enumerate(self.images):
+            path = path_template.format(index=index)
+            Image.fromarray(image).save(path, format=image_format, **options)
+            paths.append(path)
+        return paths
+
+    def to_dict(self, urls: Sequence[str]) -> dict[str, Any]:
+        """
+        Index of the atlases as a JSON-serializable dict, with the position of every frame,
+        given the URLs where the atlases are served, in order.
+        """
+        frames = []
+        for frame_index in range(self.total_frames):
+            atlas_index, x, y, width, height = self.get_frame_box(frame_index)
+            frame: dict[str, Any] = {'atlas': atlas_index, 'x': x, 'y': y, 'w': width, 'h': height}
+            if self.frame_interval:
+                frame.update({'start': frame_index * self.frame_interval,
+                              'end': (frame_index + 1) * self.frame_interval})
+            frames.append(frame)
+        return {
+            'atlases': list(urls),
+            'frame_width': self.frame_width,
+            'frame_height': self.frame_height,
+            'cols': self.cols,
+            'rows': self.rows,
+            'frame_interval': self.frame_interval,
+            'frames': frames,
+        }
+
+    def to_json(self, urls: Sequence[str]) -> str:
+        """
+        Same as to_dict, but as a JSON string.
+        """
+        return json.dumps(self.to_dict(urls))
+
+    def to_webvtt(self, urls: Sequence[str]) -> str:
+        """
+        WebVTT thumbnails track with a cue for each frame pointing to its position in its atlas,
+        given the URLs where the atlases are served, in order.
+
+        :raises ValueError if the time between frames isn't known
+        """
+        if not self.frame_interval:
+            raise ValueError('A WebVTT index needs the frames\' frame_interval')
+        cues = []
+        for frame_index in range(self.total_frames):
+            atlas_index, x, y, width, height = self.get_frame_box(frame_index)
+            cues.append((frame_index * self.frame_interval, (frame_index + 1) * self.frame_interval,
+                         frame_url(urls[atlas_index], x, y, width, height)))
+        return make_webvtt(cues)
+
+    def __repr__(self) -> str:
+        return "<%s: %s %sx%s frames in %s atlases with a %sx%s grid>" % (
+            self.__class__.__name__,
+            self.total_frames, self.frame_width, self.frame_height, len(self.images), self.cols, self.rows
+        )
@@ -0,0 +1,254 @@
+import abc
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# query parameters that change between requests for the same content, like YouTube's signatures
+VOLATILE_QUERY_PARAMS = frozenset(['sigh'])
+
+
+def url_cache_key(url: str) -> str:
+    """
+    Cache key for a URL's content, ignoring its volatile query parameters.
+    """
+    parsed_url = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parsed_url.query, keep_blank_values=True)
+             if name not in VOLATILE_QUERY_PARAMS]
+    return urlunsplit(parsed_url._replace(query=urlencode(query), fragment=''))
+
+
+class Cache(abc.ABC):
+    """
+    Key-value store for downloaded content, such as thumbframes' metadata and images.
+    Keeps count of its hits, misses and evictions.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abc.abstractmethod
+    def _set(self, key: str, value: bytes) -> None:
+        pass
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Remove the entry for key, if it's in the cache.
+        """
+        pass
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """
+        Remove all the entries in the cache.
+        """
+        pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get the value stored for key, or None if it's not in the cache.
+        """
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Store value for key, evicting other entries if needed.
+        """
+        self._set(key, value)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def __repr__(self) -> str:
+        return "<%s: %s hits, %s misses, %s evictions>" % (
+            self.__class__.__name__, self.hits, self.misses, self.evictions
+        )
+
+
+class DiskCache(Cache):
+    """
+    Persistent cache stored in an SQLite database inside directory.
+    Once the entries' total size goes over max_size bytes, the least recently used entries are evicted.
+    Entries older than ttl seconds are considered expired, or never if ttl is None.
+    A DiskCache can be shared by many threads and by different processes using the same directory.
+    """
+
+    _FILENAME = 'thumbframes_dl.sqlite3'
+
+    def __init__(self, directory: str, max_size: int = 512 * 1024 * 1024, ttl: Optional[float] = 30 * 24 * 60 * 60):
+        super().__init__()
+        self.directory = os.path.expanduser(directory)
+        self.max_size = max_size
+        self.ttl = ttl
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.directory, self._FILENAME),
+                                   check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS entries ('
+                         'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+                         'created REAL NOT NULL, accessed REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+
+    def _get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT value, created FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl is not None and created + self.ttl < now:
+                self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+                return None
+            self._db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+        return value
+
+    def _set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_size:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO entries (key, value, size, created, accessed) '
+                             'VALUES (?, ?, ?, ?, ?)', (key, value, len(value), now, now))
+            self._evict()
+
+    def _evict(self) -> None:
+        total_size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total_size <= self.max_size:
+            return
+        evicted_keys = []
+        for key, size in self._db.execute('SELECT key, size FROM entries ORDER BY accessed ASC'):
+            evicted_keys.append((key,))
+            total_size -= size
+            if total_size <= self.max_size:
+                break
+        self._db.executemany('DELETE FROM entries WHERE key = ?', evicted_keys)
+        with self._stats_lock:
+            self.evictions += len(evicted_keys)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute('DELETE FROM entries')
+
+    @property
+    def size(self) -> int:
+        """
+        Total size in bytes of all the cached entries.
+        """
+        with self._lock:
+            return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class MemoryCache(Cache):
+    """
+    In-memory cache that holds up to max_size bytes.
+    Once the entries' total size goes over max_size bytes, the least recently used entries are evicted.
+    A MemoryCache can be shared by many threads.
+    """
+
+    def __init__(self, max_size: int = 64 * 1024 * 1024):
+        super().__init__()
+        self.max_size = max_size
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_size:
+            return
+        with self._lock:
+            old_value = self._entries.pop(key, None)
+            if old_value is not None:
+                self._size -= len(old_value)
+            self._entries[key] = value
+            self._size += len(value)
+            self._evict()
+
+    def _evict(self) -> None:
+        evictions = 0
+        while self._size > self.max_size:
+            _, value = self._entries.popitem(last=False)
+            self._size -= len(value)
+            evictions += 1
+        if evictions:
+            with self._stats_lock:
+                self.evictions += evictions
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._size -= len(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        """
+        Total size in bytes of all the cached entries.
+        """
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_image_cache: Optional[MemoryCache] = None
+_image_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> MemoryCache:
+    """
+    The MemoryCache shared by all the images in the process, that keeps their raw bytes once they're downloaded.
+    """
+    global _image_cache
+    with _image_cache_lock:
+        if _image_cache is None:
+            _image_cache = MemoryCache()
+        return _image_cache
+
+
+def set_image_cache(cache: MemoryCache) -> None:
+    """
+    Replace the MemoryCache shared by all the images, for example to change its max_size.
+    """
+    global _image_cache
+    with _image_cache_lock:
+        _image_cache = cache
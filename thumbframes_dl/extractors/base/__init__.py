@@ -1,4 +1,5 @@
 # flake8: noqa F401
 from .format import ThumbFramesFormat
-from .frames import WebsiteFrames
-from .image import ThumbFramesImage
+from .frames import FramesResult, WebsiteFrames
+from .image import (ThumbFramesImage, ThumbFramesImageList, async_download_images, download_images,
+                    download_raw_images)
@@ -1,7 +1,8 @@
+import math
 from functools import reduce, total_ordering
-from typing import List, Optional
+from typing import Any, Optional, Sequence, Tuple
 
-from .image import ThumbFramesImage
+from .image import ThumbFramesImage, ThumbFramesImageList
 
 
 @total_ordering
@@ -10,14 +11,115 @@ class ThumbFramesFormat(object):
     Basic metadata to show the qualities of each set of ThumbFramesImages.
     Useful when there's more than one list of images per video.
     Can be compared and sorted to get the frames with the highest resolution.
+    If the images have a frame_interval, it can also find the frame that's shown at any timestamp of the video.
     """
 
-    def __init__(self, format_id: Optional[str], thumbframes: List[ThumbFramesImage]):
+    def __init__(self, format_id: Optional[str], thumbframes: Sequence[ThumbFramesImage]):
         self.format_id = format_id
+        if isinstance(thumbframes, ThumbFramesImageList):
+            # read everything from the list's grid, without creating any image
+            self.frame_width = thumbframes.frame_width
+            self.frame_height = thumbframes.frame_height
+            self.total_frames = thumbframes.total_frames
+            self.total_images = len(thumbframes)
+            self.frame_interval = thumbframes.frame_interval
+            self._cols = thumbframes.cols
+            self._frames_per_image = thumbframes.cols * thumbframes.rows
+            return
         self.frame_width = thumbframes[0].width // thumbframes[0].cols
         self.frame_height = thumbframes[0].height // thumbframes[0].rows
         self.total_frames = reduce(lambda acum, x: acum + x.n_frames, thumbframes, 0)
         self.total_images = len(thumbframes)
+        self.frame_interval = thumbframes[0].frame_interval
+        # all images but the last one have a full grid, so a frame's position can be computed from its index
+        self._cols = thumbframes[0].cols
+        self._frames_per_image = thumbframes[0].cols * thumbframes[0].rows
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        The format's metadata as a JSON-serializable dict.
+        """
+        return {
+            'format_id': self.format_id,
+            'frame_width': self.frame_width,
+            'frame_height': self.frame_height,
+            'total_frames': self.total_frames,
+            'total_images': self.total_images,
+            'frame_interval': self.frame_interval,
+            'cols': self._cols,
+            'frames_per_image': self._frames_per_image,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'ThumbFramesFormat':
+        """
+        Restore a format from the dict returned by to_dict, without its images.
+        """
+        tf_format = cls.__new__(cls)
+        tf_format.format_id = data['format_id']
+        tf_format.frame_width = data['frame_width']
+        tf_format.frame_height = data['frame_height']
+        tf_format.total_frames = data['total_frames']
+        tf_format.total_images = data['total_images']
+        tf_format.frame_interval = data['frame_interval']
+        tf_format._cols = data['cols']
+        tf_format._frames_per_image = data['frames_per_image']
+        return tf_format
+
+    def get_frame_index(self, timestamp: float) -> Optional[int]:
+        """
+        Index of the frame shown at timestamp (in seconds), counting from the first frame of the first image.
+        Timestamps before the start or after the end of the video return the first or last frame.
+        Returns None if the format has no frame_interval.
+        """
+        if not self.frame_interval:
+            return None
+        return max(0, min(int(timestamp // self.frame_interval), self.total_frames - 1))
+
+    def get_frame_position(self, timestamp: float) -> Optional[Tuple[int, int, int]]:
+        """
+        Position of the frame shown at timestamp (in seconds) as a tuple of (image index, row, col).
+        Returns None if the format has no frame_interval.
+        """
+        frame_index = self.get_frame_index(timestamp)
+        if frame_index is None:
+            return None
+        return self.get_index_position(frame_index)
+
+    def get_index_position(self, frame_index: int) -> Tuple[int, int, int]:
+        """
+        Position of the frame with frame_index as a tuple of (image index, row, col).
+        """
+        image_index, index_in_image = divmod(frame_index, self._frames_per_image)
+        return (image_index,) + divmod(index_in_image, self._cols)  # type: ignore[return-value]
+
+    def get_frame_timestamp(self, frame_index: int) -> Optional[float]:
+        """
+        Timestamp (in seconds) at which the frame with frame_index starts.
+        Returns None if the format has no frame_interval.
+        """
+        if not self.frame_interval:
+            return None
+        return frame_index * self.frame_interval
+
+    @property
+    def total_pixels(self) -> int:
+        """
+        Number of pixels in all the format's images, which is proportional to their download size.
+        The last image only counts the rows it needs for its remaining frames.
+        """
+        remaining_frames = self.total_frames - (self.total_images - 1) * self._frames_per_image
+        last_image_cells = remaining_frames if remaining_frames <= self._cols \
+            else int(math.ceil(remaining_frames / float(self._cols))) * self._cols
+        return ((self.total_images - 1) * self._frames_per_image + last_image_cells) * self.frame_size
+
+    def is_sufficient(self, min_frame_width: int = 0, min_frame_height: int = 0, min_frames: int = 0) -> bool:
+        """
+        Whether the format's frames are at least min_frame_width by min_frame_height pixels
+        and there are at least min_frames of them.
+        """
+        return self.frame_width >= min_frame_width and self.frame_height >= min_frame_height \
+            and self.total_frames >= min_frames
 
     def __hash__(self) -> int:
         return hash(self.format_id)
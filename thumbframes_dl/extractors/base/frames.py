@@ -1,26 +1,252 @@
 import abc
-from typing import Optional, Sequence, Union
+import asyncio
+import json
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import IO, Any, AsyncIterator, Iterable, Iterator, Mapping, Optional, Sequence, Union
+from urllib.request import Request
 
-from youtube_dl.YoutubeDL import YoutubeDL
 from youtube_dl.extractor.common import InfoExtractor
 
-from thumbframes_dl.utils import logger
+from thumbframes_dl.atlas import SpriteAtlas
+from thumbframes_dl.hashing import HASH_METHODS, HASH_SIZE, video_signature
+from thumbframes_dl.imaging import copy_grid_frames, decode_image, frames_grid, import_numpy, import_pil_image
+from thumbframes_dl.preview import save_preview
+from thumbframes_dl.ratelimit import TokenBucket
+from thumbframes_dl.scenes import detect_scenes
+from thumbframes_dl.session import Session, get_default_session
+from thumbframes_dl.utils import logger, ExtractorError
+from thumbframes_dl.webvtt import frame_url, make_webvtt
 
 from .format import ThumbFramesFormat
-from .image import ThumbFramesImage
+from .image import ThumbFramesImage, ThumbFramesImageList, async_download_images, download_images, download_raw_images
+
+
+# a website's thumbframes, either a dict with the images of each format or the images of its only format
+ThumbFramesInfo = Union[Mapping[str, Sequence[ThumbFramesImage]], Sequence[ThumbFramesImage]]
+
+
+def _images_to_dict(tf_images: Sequence[ThumbFramesImage]) -> Any:
+    if isinstance(tf_images, ThumbFramesImageList):
+        return tf_images.to_dict()
+    return [tf_image.to_dict() for tf_image in tf_images]
+
+
+def _get_image_grid(tf_images: Sequence[ThumbFramesImage], index: int) -> tuple[str, int, int]:
+    """
+    URL, cols and n_frames of an image, without creating the image if it's in a ThumbFramesImageList.
+    """
+    if isinstance(tf_images, ThumbFramesImageList):
+        cols, _, n_frames = tf_images.get_grid(index)
+        return tf_images.get_url(index), cols, n_frames
+    tf_image = tf_images[index]
+    return tf_image.url, tf_image.cols, tf_image.n_frames
+
+
+def _images_from_dict(data: Any, session: Optional[Session]) -> Sequence[ThumbFramesImage]:
+    if isinstance(data, dict):
+        return ThumbFramesImageList.from_dict(data, session=session)
+    return [ThumbFramesImage.from_dict(image_data, session=session) for image_data in data]
+
+
+class FramesResult(object):
+    """
+    Result of extracting a single video in a batch.
+    If the extraction failed, video is None and error contains the exception that was raised.
+    """
+
+    def __init__(self, url: str, video: Optional['WebsiteFrames'] = None, error: Optional[Exception] = None):
+        self.url = url
+        self.video = video
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        return "<%s %s: %s>" % (
+            self.__class__.__name__, self.url, self.video if self.ok else repr(self.error)
+        )
 
 
 class WebsiteFrames(abc.ABC, InfoExtractor):
     """
     Represents a video and contains its frames.
     A subclass of this class needs to be implemented for each supported website.
+    The thumbframes' metadata is downloaded when the object is created,
+    unless lazy is True, in which case it's downloaded the first time it's needed.
+    By default, all videos share the same Session to download their pages and images,
+    but a different Session can be passed to isolate a group of videos.
     """
 
-    def __init__(self, video_url: str):
-        self.set_downloader(YoutubeDL({'source_address': '0.0.0.0', 'logger': logger}))
+    def __init__(self, video_url: str, session: Optional[Session] = None, lazy: bool = False):
+        self._session = session or get_default_session()
+        self.set_downloader(self._session.downloader)
         self._input_url = video_url
         self._validate()
-        self._thumbframes = self.download_thumbframe_info()
+        self._thumbframes_info: Optional[ThumbFramesInfo] = None
+        self._duration: Optional[float] = None
+        self._formats: Optional[tuple[ThumbFramesFormat, ...]] = None
+        self._formats_by_id: dict[Optional[str], ThumbFramesFormat] = {}
+        self._prefetch_lock = threading.Lock()
+        self._async_prefetch_task: Optional[asyncio.Future] = None
+        if not lazy:
+            self.prefetch()
+
+    @classmethod
+    async def async_from_url(cls, video_url: str, session: Optional[Session] = None, **kwargs) -> 'WebsiteFrames':
+        """
+        Same as the constructor, but downloads the thumbframes' metadata with asyncio.
+        Any other keyword arguments are passed to the video's constructor.
+
+        :raises ExtractorError
+        """
+        video = cls(video_url, session=session, lazy=True, **kwargs)  # type: ignore[abstract]
+        await video.async_prefetch()
+        return video
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        The video's thumbframes' metadata as a JSON-serializable dict, without any downloaded image.
+        Downloads the metadata first if it hasn't been downloaded yet.
+
+        :raises ExtractorError
+        """
+        thumbframes = self._thumbframes
+        data: dict[str, Any] = {'video_url': self.video_url, 'duration': self._duration}
+        if isinstance(thumbframes, Mapping):
+            data['formats'] = {format_id: _images_to_dict(tf_images) for format_id, tf_images in thumbframes.items()}
+        else:
+            data['images'] = _images_to_dict(thumbframes)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], session: Optional[Session] = None, **kwargs) -> 'WebsiteFrames':
+        """
+        Restore a video from the dict returned by to_dict, without downloading anything,
+        so its images can be downloaded directly. Any other keyword arguments are passed to the video's constructor.
+
+        :raises ExtractorError if the video's URL isn't valid for this website
+        """
+        video = cls(data['video_url'], session=session, lazy=True, **kwargs)  # type: ignore[abstract]
+        video._duration = data.get('duration')
+        if 'formats' in data:
+            video._thumbframes = {format_id: _images_from_dict(images_data, session)
+                                  for format_id, images_data in data['formats'].items()}
+        else:
+            video._thumbframes = _images_from_dict(data['images'], session)
+        return video
+
+    def to_bytes(self) -> bytes:
+        """
+        Same as to_dict, but as compressed bytes that take much less space when stored.
+
+        :raises ExtractorError
+        """
+        return zlib.compress(json.dumps(self.to_dict(), separators=(',', ':')).encode('utf-8'))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, session: Optional[Session] = None, **kwargs) -> 'WebsiteFrames':
+        """
+        Restore a video from the bytes returned by to_bytes. See from_dict.
+
+        :raises ExtractorError if the video's URL isn't valid for this website
+        """
+        return cls.from_dict(json.loads(zlib.decompress(data).decode('utf-8')), session=session, **kwargs)
+
+    @property
+    def _thumbframes(self) -> ThumbFramesInfo:
+        if self._thumbframes_info is None:
+            self.prefetch()
+        return self._thumbframes_info  # type: ignore[return-value]
+
+    @_thumbframes.setter
+    def _thumbframes(self, thumbframes: ThumbFramesInfo) -> None:
+        self._thumbframes_info = thumbframes
+        # formats are computed again the next time they're needed
+        self._formats = None
+        self._formats_by_id = {}
+
+    def prefetch(self) -> None:
+        """
+        Download the thumbframes' metadata, unless it was already downloaded.
+        Videos created with lazy=True call this automatically the first time their thumbframes are needed,
+        but it can be called explicitly to control when the download happens.
+
+        :raises ExtractorError
+        """
+        with self._prefetch_lock:
+            if self._thumbframes_info is None:
+                self._thumbframes = self.download_thumbframe_info()
+
+    async def async_prefetch(self) -> None:
+        """
+        Same as prefetch, but downloads the thumbframes' metadata with asyncio.
+        Calls made while the metadata is being downloaded wait for the same download.
+
+        :raises ExtractorError
+        """
+        if self._thumbframes_info is not None:
+            return
+        task = self._async_prefetch_task
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = self._async_prefetch_task = asyncio.ensure_future(self.async_download_thumbframe_info())
+        try:
+            # a cancelled call doesn't cancel the download that other calls are waiting for
+            thumbframes = await asyncio.shield(task)
+        finally:
+            if task.done() and self._async_prefetch_task is task:
+                self._async_prefetch_task = None
+        if self._thumbframes_info is None:
+            self._thumbframes = thumbframes
+
+    @classmethod
+    def from_many(cls, video_urls: Iterable[str], max_workers: int = 8, rate_limit: Optional[float] = None,
+                  burst: int = 1, session: Optional[Session] = None, **kwargs) -> Iterator[FramesResult]:
+        """
+        Extract the thumbframes' metadata of many videos, using a pool of up to max_workers threads.
+        If rate_limit is set, no more than rate_limit videos per second will be started on average,
+        and no more than burst videos will be started at once, including the first ones.
+        Any other keyword arguments are passed to each video's constructor.
+        Yields a FramesResult for each video as soon as its extraction finishes, so the results may
+        not be in the same order as the URLs. A video that fails doesn't stop the rest of the batch.
+        """
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1')
+        session = session or get_default_session()
+        bucket = TokenBucket(rate_limit, capacity=burst) if rate_limit else None
+
+        def _extract(video_url: str) -> FramesResult:
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                video = cls(video_url, session=session, **kwargs)  # type: ignore[abstract]
+                return FramesResult(video_url, video=video)
+            except Exception as e:
+                logger.warning('Unable to extract thumbframes from {}: {}'.format(video_url, e))
+                return FramesResult(video_url, error=e)
+
+        # keep a bounded number of videos queued, so video_urls can be a long or lazy iterable
+        urls_iter = iter(video_urls)
+        pending: set[Future] = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for video_url in urls_iter:
+                    pending.add(executor.submit(_extract, video_url))
+                    if len(pending) >= max_workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
 
     @abc.abstractmethod
     def _validate(self) -> None:
@@ -49,20 +275,78 @@ class WebsiteFrames(abc.ABC, InfoExtractor):
         """
         pass
 
+    @property
+    def duration(self) -> Optional[float]:
+        """
+        The video's duration in seconds.
+        If the website doesn't provide it, it may be estimated from the thumbframes, or None if that's not possible.
+        """
+        self.prefetch()
+        return self._duration
+
+    def _request_webpage(self, url_or_request, video_id, note=None, errnote=None, fatal=True, *args, **kwargs):
+        """
+        Same as InfoExtractor._request_webpage, but throttled and retried according to the Session's RetryPolicy,
+        so webpages and API calls follow the same policy as the images.
+        """
+        url = url_or_request.get_full_url() if isinstance(url_or_request, Request) else url_or_request
+        try:
+            return self._session.retry_policy.call(url, lambda: super(WebsiteFrames, self)._request_webpage(
+                url_or_request, video_id, note, errnote, True, *args, **kwargs))
+        except ExtractorError as e:
+            if fatal:
+                raise
+            self._downloader.report_warning(e.msg)
+            return False
+
+    def _get_cached_metadata(self, name: str) -> Optional[str]:
+        """
+        Get a piece of the video's metadata from the Session's Cache, if there's any.
+        """
+        if self._session.cache is None:
+            return None
+        value = self._session.cache.get('{}:{}:{}'.format(self.__class__.__name__, self.video_id, name))
+        return value.decode('utf-8') if value is not None else None
+
+    def _delete_cached_metadata(self, name: str) -> None:
+        """
+        Remove a piece of the video's metadata from the Session's Cache, if there's any.
+        """
+        if self._session.cache is not None:
+            self._session.cache.delete('{}:{}:{}'.format(self.__class__.__name__, self.video_id, name))
+
+    def _set_cached_metadata(self, name: str, value: str) -> None:
+        """
+        Store a piece of the video's metadata in the Session's Cache, if there's any.
+        """
+        if self._session.cache is not None:
+            self._session.cache.set('{}:{}:{}'.format(self.__class__.__name__, self.video_id, name),
+                                    value.encode('utf-8'))
+
     @property
     def thumbframe_formats(self) -> Optional[Sequence[ThumbFramesFormat]]:
         """
         Available thumbframe formats for the video. Sorted by highest resolution.
         """
-        if len(self._thumbframes) == 0:
-            return None
+        return self._get_formats() or None
 
-        if isinstance(self._thumbframes, dict):
-            return tuple(sorted([ThumbFramesFormat(format_id, tf_images)
-                                 for format_id, tf_images
-                                 in self._thumbframes.items()], reverse=True))
-        else:
-            return tuple([ThumbFramesFormat(None, self._thumbframes)])
+    def _get_formats(self) -> tuple[ThumbFramesFormat, ...]:
+        """
+        Thumbframe formats sorted by highest resolution, computed only once after _thumbframes is set.
+        """
+        thumbframes = self._thumbframes
+        if self._formats is None:
+            if len(thumbframes) == 0:
+                formats: tuple[ThumbFramesFormat, ...] = tuple()
+            elif isinstance(thumbframes, Mapping):
+                formats = tuple(sorted([ThumbFramesFormat(format_id, tf_images)
+                                        for format_id, tf_images
+                                        in thumbframes.items()], reverse=True))
+            else:
+                formats = tuple([ThumbFramesFormat(None, thumbframes)])
+            self._formats_by_id = {tf_format.format_id: tf_format for tf_format in formats}
+            self._formats = formats
+        return self._formats
 
     def get_thumbframe_format(self, format_id: Optional[str] = None) -> Optional[ThumbFramesFormat]:
         """
@@ -70,50 +354,478 @@ class WebsiteFrames(abc.ABC, InfoExtractor):
         Will return None if format_id is not found in video's thumbframe formats.
         If no format_id is passed, this will return the highest resolution thumbframe format.
         """
-        if self.thumbframe_formats is None:
+        formats = self._get_formats()
+        if not formats:
             return None
 
-        if isinstance(self._thumbframes, list):
-            return ThumbFramesFormat(None, self._thumbframes)
-        elif isinstance(self._thumbframes, dict):
-            if format_id is None:
-                return self.thumbframe_formats[0]
-            elif format_id in self._thumbframes:
-                return ThumbFramesFormat(format_id, self._thumbframes[format_id])
-        return None
+        if not isinstance(self._thumbframes, Mapping) or format_id is None:
+            return formats[0]
+        return self._formats_by_id.get(format_id)
+
+    def select_thumbframe_format(self, min_frame_width: int = 0, min_frame_height: int = 0, min_frames: int = 0
+                                 ) -> Optional[ThumbFramesFormat]:
+        """
+        Get the cheapest thumbframe format that's good enough: among the formats with frames of at least
+        min_frame_width by min_frame_height pixels and at least min_frames frames in total,
+        the one with the fewest pixels to download, or the fewest images if there's a tie.
+        If no format is good enough, the highest resolution thumbframe format is returned.
+        Returns None if the video has no thumbframes.
+        """
+        formats = self._get_formats()
+        if not formats:
+            return None
+        sufficient_formats = [tf_format for tf_format in formats
+                              if tf_format.is_sufficient(min_frame_width, min_frame_height, min_frames)]
+        if not sufficient_formats:
+            return formats[0]
+        return min(sufficient_formats, key=lambda tf_format: (tf_format.total_pixels, tf_format.total_images))
 
     @abc.abstractmethod
-    def download_thumbframe_info(self) -> Union[dict[str, list[ThumbFramesImage]], list[ThumbFramesImage]]:
+    def download_thumbframe_info(self) -> ThumbFramesInfo:
         """
         Get all the thumbframe's metadata from the video. The actual image files are downloaded later.
         If the page offers more than 1 thumbframe set (for example with different resolutions),
         then this method should return a dict so each set is listed separately. Otherwise, return a list.
+        Numbered images that share the same grid can be returned as a ThumbFramesImageList to save memory.
         """
         pass
 
-    def get_thumbframes(self, format_id: Optional[str] = None, lazy=True) -> list[ThumbFramesImage]:
+    async def async_download_thumbframe_info(self) -> ThumbFramesInfo:
+        """
+        Same as download_thumbframe_info, but with asyncio.
+        Subclasses should override this method with a native asyncio implementation.
+        Otherwise, download_thumbframe_info is run in the event loop's default executor.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.download_thumbframe_info)
+
+    def _get_thumbframes_list(self, format_id: Optional[str]) -> Sequence[ThumbFramesImage]:
+        # _thumbframes may be a single list or many lists in a dict.
+        # If it's the latter, a format_id needs to be passed to know which images set needs to be returned.
+        if not isinstance(self._thumbframes, Mapping):
+            return self._thumbframes
+        if not format_id:
+            default_format = self.get_thumbframe_format()
+            if default_format is None:
+                return []
+            format_id = default_format.format_id
+        return self._thumbframes.get(format_id, [])  # type: ignore[arg-type]
+
+    def _on_image_error(self, error: ExtractorError) -> None:
+        """
+        Called when one of the video's images couldn't be downloaded by one of this class' methods.
+        Subclasses can override it, for example to remove stale metadata from the Session's Cache.
+        """
+        pass
+
+    def _get_image(self, tf_image: ThumbFramesImage, keep: bool = True) -> bytes:
+        """
+        Same as tf_image.get_image, but calls _on_image_error if the image can't be downloaded.
+
+        :raises ExtractorError
+        """
+        try:
+            return tf_image.get_image(keep)
+        except ExtractorError as e:
+            self._on_image_error(e)
+            raise
+
+    async def _async_get_image(self, tf_image: ThumbFramesImage, keep: bool = True) -> bytes:
+        """
+        Same as tf_image.async_get_image, but calls _on_image_error if the image can't be downloaded.
+
+        :raises ExtractorError
+        """
+        try:
+            return await tf_image.async_get_image(keep)
+        except ExtractorError as e:
+            self._on_image_error(e)
+            raise
+
+    def _raise_for_failed_images(self, thumbframes_list: Sequence[ThumbFramesImage],
+                                 errors: list[Optional[ExtractorError]]) -> None:
+        failed = [(i, error) for i, error in enumerate(errors) if error is not None]
+        if failed:
+            for i, error in failed:
+                self._on_image_error(error)
+                logger.warning('Unable to download thumbframes image {} of video {}: {}'.format(
+                    i, self.video_id, error))
+            raise ExtractorError('Unable to download {} of {} thumbframes images of video {}'.format(
+                len(failed), len(thumbframes_list), self.video_id), cause=failed[0][1], video_id=self.video_id)
+
+    def _download_raw_images(self, thumbframes_list: Sequence[ThumbFramesImage], max_workers: int = 1
+                             ) -> list[bytes]:
+        """
+        Download the raw bytes of all the images with download_raw_images, so they're held until the caller
+        is done with them even if the image cache evicts them in the meantime.
+
+        :raises ExtractorError if any of the images couldn't be downloaded
+        """
+        results = download_raw_images(thumbframes_list, max_workers=max_workers)
+        self._raise_for_failed_images(thumbframes_list, [result if isinstance(result, ExtractorError) else None
+                                                         for result in results])
+        return results  # type: ignore[return-value]
+
+    def get_thumbframes(self, format_id: Optional[str] = None, lazy=True, max_workers: int = 1
+                        ) -> list[ThumbFramesImage]:
         """
         Get the video's ThumbFramesImages as a list.
         If a webpage has more than one thumbframe format, the format_id parameter needs to be set so this method
         knows which images to return.
         By default, the images are downloaded lazily until the image property is called for each object.
-        If the lazy parameter is set to False, all the images will be downloaded right away.
+        If the lazy parameter is set to False, all the images will be downloaded right away,
+        using up to max_workers parallel downloads for this video.
+        Downloaded images are kept in the process' image cache (see get_image_cache), which has a limited size,
+        so if a format's images don't fit in it, the least recently used ones are evicted
+        and downloaded again the next time they're needed.
+
+        :raises ExtractorError if lazy is False and any of the images couldn't be downloaded.
+        The rest of the images are still downloaded.
         """
+        thumbframes_list = self._get_thumbframes_list(format_id)
+        if not lazy:
+            self._raise_for_failed_images(thumbframes_list,
+                                          download_images(thumbframes_list, max_workers=max_workers))
+        return list(thumbframes_list)
 
-        # _thumbframes may be a single list or many lists in a dict.
-        # If it's the latter, a format_id needs to be passed to know which images set needs to be returned.
-        if isinstance(self._thumbframes, list):
-            thumbframes_list = self._thumbframes
-        elif isinstance(self._thumbframes, dict):
-            if not format_id and self.thumbframe_formats:
-                format_id = self.thumbframe_formats[0].format_id
-            thumbframes_list = self._thumbframes.get(format_id, [])  # type: ignore[arg-type]
+    async def async_get_thumbframes(self, format_id: Optional[str] = None, lazy=True, max_concurrency: int = 8
+                                    ) -> list[ThumbFramesImage]:
+        """
+        Same as get_thumbframes, but if the lazy parameter is set to False,
+        the images are downloaded with asyncio, up to max_concurrency at the same time.
 
+        :raises ExtractorError if lazy is False and any of the images couldn't be downloaded.
+        """
+        await self.async_prefetch()
+        thumbframes_list = self._get_thumbframes_list(format_id)
         if not lazy:
-            # call image property to force downloads
-            list(map(lambda img: img.get_image(), thumbframes_list))
+            self._raise_for_failed_images(thumbframes_list,
+                                          await async_download_images(thumbframes_list, max_concurrency))
+        return list(thumbframes_list)
+
+    def iter_thumbframes(self, format_id: Optional[str] = None, prefetch: int = 4, keep: bool = False
+                         ) -> Iterator[tuple[ThumbFramesImage, bytes]]:
+        """
+        Download the video's images in order and yield each one as a tuple of (ThumbFramesImage, raw image),
+        while up to prefetch images are downloaded ahead in parallel.
+        Unless keep is True, the raw images aren't kept in the ThumbFramesImages,
+        so memory use stays the same no matter how many images the video has.
+        The format_id parameter works the same as in get_thumbframes.
+
+        :raises ExtractorError when an image can't be downloaded, once the previous images were yielded
+        """
+        if prefetch < 1:
+            raise ValueError('prefetch must be at least 1')
+        pending: deque[tuple[ThumbFramesImage, Future]] = deque()
+        with ThreadPoolExecutor(max_workers=prefetch) as executor:
+            try:
+                for tf_image in self._get_thumbframes_list(format_id):
+                    pending.append((tf_image, executor.submit(self._get_image, tf_image, keep)))
+                    if len(pending) >= prefetch:
+                        tf_image, future = pending.popleft()
+                        yield tf_image, future.result()
+                while pending:
+                    tf_image, future = pending.popleft()
+                    yield tf_image, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    async def async_iter_thumbframes(self, format_id: Optional[str] = None, prefetch: int = 4, keep: bool = False
+                                     ) -> AsyncIterator[tuple[ThumbFramesImage, bytes]]:
+        """
+        Same as iter_thumbframes, but downloads the images with asyncio.
+
+        :raises ExtractorError when an image can't be downloaded, once the previous images were yielded
+        """
+        if prefetch < 1:
+            raise ValueError('prefetch must be at least 1')
+        await self.async_prefetch()
+        pending: deque[tuple[ThumbFramesImage, asyncio.Task]] = deque()
+        try:
+            for tf_image in self._get_thumbframes_list(format_id):
+                pending.append((tf_image, asyncio.ensure_future(self._async_get_image(tf_image, keep))))
+                if len(pending) >= prefetch:
+                    tf_image, task = pending.popleft()
+                    yield tf_image, await task
+            while pending:
+                tf_image, task = pending.popleft()
+                yield tf_image, await task
+        finally:
+            for _, task in pending:
+                task.cancel()
 
-        return thumbframes_list
+    def get_frame_position(self, timestamp: float, format_id: Optional[str] = None
+                           ) -> Optional[tuple[ThumbFramesImage, int, int]]:
+        """
+        Find the frame shown at timestamp (in seconds) without downloading any image.
+        Returns a tuple with the ThumbFramesImage that contains the frame and the frame's row and column in it,
+        or None if the format doesn't exist or doesn't know the time between its frames.
+        The format_id parameter works the same as in get_thumbframes.
+        """
+        tf_format = self.get_thumbframe_format(format_id)
+        position = tf_format.get_frame_position(timestamp) if tf_format else None
+        if position is None:
+            return None
+        image_index, row, col = position
+        return self._get_thumbframes_list(tf_format.format_id)[image_index], row, col  # type: ignore[union-attr]
+
+    def get_frame_at(self, timestamp: float, format_id: Optional[str] = None, as_pil: bool = False) -> Any:
+        """
+        Get the frame shown at timestamp (in seconds), downloading only the image that contains it.
+        See ThumbFramesImage.iter_frames for the type of the frame. Requires numpy and Pillow.
+        Returns None if the frame can't be found, see get_frame_position.
+
+        :raises ExtractorError
+        """
+        position = self.get_frame_position(timestamp, format_id)
+        if position is None:
+            return None
+        tf_image, row, col = position
+        return tf_image.get_frame(row, col, as_pil=as_pil)
+
+    def get_sample_positions(self, n_samples: Optional[int] = None, timestamps: Optional[Sequence[float]] = None,
+                             format_id: Optional[str] = None, min_frame_width: int = 0, min_frame_height: int = 0
+                             ) -> list[tuple[ThumbFramesImage, int, int]]:
+        """
+        Find a sample of the video's frames without downloading any image, either n_samples frames evenly spaced
+        across the video or the frames shown at each one of timestamps (in seconds).
+        Unless a format_id is passed, the samples are taken from the format that needs the fewest images,
+        or the highest resolution one if there's a tie, among the formats with frames of at least
+        min_frame_width by min_frame_height pixels.
+        Returns a tuple with the ThumbFramesImage, row and column of each sample, in order.
+        """
+        if (n_samples is None) == (timestamps is None):
+            raise ValueError('Either n_samples or timestamps must be set')
+
+        if format_id is not None:
+            tf_format = self.get_thumbframe_format(format_id)
+            formats: Sequence[ThumbFramesFormat] = [tf_format] if tf_format else []
+        else:
+            formats = [tf_format for tf_format in self._get_formats()
+                       if tf_format.is_sufficient(min_frame_width, min_frame_height)] or self._get_formats()
+
+        best_format, best_positions, best_key = None, [], None
+        for tf_format in formats:
+            frame_indexes: list[Optional[int]]
+            if timestamps is not None:
+                frame_indexes = [tf_format.get_frame_index(timestamp) for timestamp in timestamps]
+            else:
+                sample_count = n_samples or 0
+                frame_indexes = [int((i + 0.5) * tf_format.total_frames / sample_count) for i in range(sample_count)]
+            if None in frame_indexes:
+                continue  # format doesn't know the time between its frames
+            positions = [tf_format.get_index_position(frame_index) for frame_index in frame_indexes
+                         if frame_index is not None]
+            key = (len({image_index for image_index, _, _ in positions}), -tf_format.frame_size)
+            if best_key is None or key < best_key:
+                best_format, best_positions, best_key = tf_format, positions, key
+
+        if best_format is None:
+            return []
+        thumbframes_list = self._get_thumbframes_list(best_format.format_id)
+        return [(thumbframes_list[image_index], row, col) for image_index, row, col in best_positions]
+
+    def get_sampled_frames(self, n_samples: Optional[int] = None, timestamps: Optional[Sequence[float]] = None,
+                           format_id: Optional[str] = None, min_frame_width: int = 0, min_frame_height: int = 0,
+                           max_workers: int = 4, as_pil: bool = False) -> list[Any]:
+        """
+        Get a sample of the video's frames, downloading only the images that contain them,
+        with up to max_workers parallel downloads. Each image is decoded only once.
+        See get_sample_positions for the rest of the parameters, and ThumbFramesImage.iter_frames for the type
+        of the frames, except that numpy frames are copies instead of views. Requires numpy and Pillow.
+
+        :raises ExtractorError
+        """
+        positions = self.get_sample_positions(n_samples, timestamps, format_id, min_frame_width, min_frame_height)
+        tf_images = list(dict.fromkeys(tf_image for tf_image, _, _ in positions))
+        raw_images = dict(zip(tf_images, self._download_raw_images(tf_images, max_workers=max_workers)))
+
+        Image = import_pil_image() if as_pil else None
+        samples_by_image: dict[ThumbFramesImage, list[tuple[int, int, int]]] = {}
+        for i, (tf_image, row, col) in enumerate(positions):
+            samples_by_image.setdefault(tf_image, []).append((i, row, col))
+
+        frames: list[Any] = [None] * len(positions)
+        for tf_image, samples in samples_by_image.items():
+            grid = frames_grid(decode_image(raw_images[tf_image]),
+                               tf_image.cols, tf_image.rows, tf_image.frame_width, tf_image.frame_height)
+            for i, row, col in samples:
+                frames[i] = Image.fromarray(grid[row, col]) if Image else grid[row, col].copy()
+        return frames
+
+    def iter_frames(self, format_id: Optional[str] = None, as_pil: bool = False) -> Iterator[Any]:
+        """
+        Yield every frame of the video's thumbframes in order, downloading and decoding each image only once.
+        The format_id parameter works the same as in get_thumbframes.
+        See ThumbFramesImage.iter_frames for the type of the frames. Requires numpy and Pillow.
+
+        :raises ExtractorError
+        """
+        for tf_image in self.get_thumbframes(format_id):
+            yield from tf_image.iter_frames(as_pil=as_pil)
+
+    def get_frames_array(self, format_id: Optional[str] = None, max_workers: int = 4,
+                         mmap_path: Optional[str] = None) -> Any:
+        """
+        Get every frame of the video's thumbframes as a single numpy array of uint8
+        with shape (total_frames, frame_height, frame_width, 3), in order.
+        Images are downloaded and decoded by up to max_workers threads, each one copying its frames directly
+        into the preallocated array. The format_id parameter works the same as in get_thumbframes.
+        If mmap_path is set, the array is memory-mapped to a .npy file in that path instead of kept in memory,
+        so it can be used for videos that are too large for RAM and loaded later with numpy.load.
+        Requires numpy and Pillow.
+
+        :raises ExtractorError
+        """
+        numpy = import_numpy()
+        thumbframes_list = self._get_thumbframes_list(format_id)
+        tf_format = self.get_thumbframe_format(format_id)
+        if tf_format is None or not thumbframes_list:
+            return numpy.empty((0, 0, 0, 3), dtype=numpy.uint8)
+
+        shape = (tf_format.total_frames, tf_format.frame_height, tf_format.frame_width, 3)
+        if mmap_path is None:
+            frames = numpy.zeros(shape, dtype=numpy.uint8)
+        else:
+            frames = numpy.lib.format.open_memmap(mmap_path, mode='w+', dtype=numpy.uint8, shape=shape)
+
+        offsets = [0]
+        for tf_image in thumbframes_list:
+            offsets.append(offsets[-1] + tf_image.n_frames)
+
+        def _decode(i: int) -> None:
+            tf_image = thumbframes_list[i]
+            grid = frames_grid(decode_image(self._get_image(tf_image)),
+                               tf_image.cols, tf_image.rows, tf_image.frame_width, tf_image.frame_height)
+            copy_grid_frames(grid, frames[offsets[i]:offsets[i + 1]])
+
+        if max_workers <= 1:
+            for i in range(len(thumbframes_list)):
+                _decode(i)
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(thumbframes_list))) as executor:
+                list(executor.map(_decode, range(len(thumbframes_list))))
+
+        if mmap_path is not None:
+            frames.flush()
+        return frames
+
+    def save_preview(self, fp: Union[str, IO[bytes]], format_id: Optional[str] = None, image_format: str = 'WEBP',
+                     fps: float = 10.0, step: int = 1, size: Optional[tuple[int, int]] = None, **options) -> None:
+        """
+        Save an animated WEBP or GIF preview of the video, streaming its images one at a time.
+        See thumbframes_dl.preview.save_preview for the parameters. Requires numpy and Pillow.
+
+        :raises ExtractorError
+        """
+        save_preview(self, fp, format_id=format_id, image_format=image_format, fps=fps, step=step, size=size,
+                     **options)
+
+    def get_webvtt(self, format_id: Optional[str] = None) -> Optional[str]:
+        """
+        WebVTT thumbnails track for video players, with a cue for each frame that points to its position
+        in its image's URL, like https://i.ytimg.com/sb/.../M0.jpg#xywh=0,0,160,90
+        It's made only from the thumbframes' metadata, without downloading any image.
+        The format_id parameter works the same as in get_thumbframes.
+        Returns None if the format doesn't exist or doesn't know the time between its frames.
+
+        :raises ExtractorError
+        """
+        tf_format = self.get_thumbframe_format(format_id)
+        if tf_format is None or not tf_format.frame_interval:
+            return None
+        frame_interval = tf_format.frame_interval
+        thumbframes_list = self._get_thumbframes_list(tf_format.format_id)
+
+        def _cues() -> Iterator[tuple[float, float, str]]:
+            frame_index = 0
+            for image_index in range(len(thumbframes_list)):
+                url, cols, n_frames = _get_image_grid(thumbframes_list, image_index)
+                for index_in_image in range(n_frames):
+                    row, col = divmod(index_in_image, cols)
+                    start = frame_index * frame_interval
+                    end = (frame_index + 1) * frame_interval
+                    if self._duration:
+                        end = max(start, min(end, self._duration))
+                    yield start, end, frame_url(url, col * tf_format.frame_width, row * tf_format.frame_height,
+                                                tf_format.frame_width, tf_format.frame_height)
+                    frame_index += 1
+
+        return make_webvtt(_cues())
+
+    def build_atlas(self, format_id: Optional[str] = None, cols: int = 10, rows: Optional[int] = None,
+                    max_workers: int = 4) -> SpriteAtlas:
+        """
+        Re-tile every frame of a format in uniform sprite atlases with cols*rows frames each,
+        or a single atlas if rows is None, so they can be saved and served with a JSON or WebVTT index.
+        Frames are downloaded and decoded with get_frames_array, and the format_id parameter works the same
+        as in get_thumbframes. Requires numpy and Pillow.
+
+        :raises ExtractorError
+        """
+        tf_format = self.get_thumbframe_format(format_id)
+        frames = self.get_frames_array(format_id, max_workers=max_workers)
+        return SpriteAtlas.from_frames(frames, cols=cols, rows=rows,
+                                       frame_interval=tf_format.frame_interval if tf_format else None)
+
+    def get_scene_changes(self, format_id: Optional[str] = None, threshold: float = 0.3, method: str = 'histogram',
+                          min_scene_length: int = 1, max_workers: int = 4) -> Optional[list[float]]:
+        """
+        Timestamps (in seconds) where a new scene starts in the video's thumbframes, after the first one.
+        Every frame is downloaded and decoded with get_frames_array and compared with the previous one,
+        see thumbframes_dl.scenes.detect_scenes for the rest of the parameters.
+        Unless a format_id is passed, the frames are taken from the cheapest format (see select_thumbframe_format),
+        which for YouTube is a single image, so long videos don't need to decode every large frame.
+        Returns None if the format doesn't know the time between its frames. Requires numpy and Pillow.
+
+        :raises ExtractorError
+        """
+        tf_format = self.get_thumbframe_format(format_id) if format_id else self.select_thumbframe_format()
+        if tf_format is None or not tf_format.frame_interval:
+            return None
+        frames = self.get_frames_array(tf_format.format_id, max_workers=max_workers)
+        cuts = detect_scenes(frames, threshold=threshold, method=method, min_scene_length=min_scene_length)
+        return [int(cut) * tf_format.frame_interval for cut in cuts]
+
+    def get_frame_hashes(self, format_id: Optional[str] = None, method: str = 'dhash', max_workers: int = 4) -> Any:
+        """
+        Perceptual hash of every frame of the video's thumbframes as a numpy array of uint64, in order.
+        The method can be 'dhash' or 'ahash', see thumbframes_dl.hashing.
+        Unless a format_id is passed, the frames are taken from the cheapest format with frames big enough
+        to be hashed (see select_thumbframe_format), which for YouTube is a single image.
+        Images are downloaded with up to max_workers parallel downloads and each one is hashed at once.
+        Requires numpy and Pillow.
+
+        :raises ExtractorError
+        """
+        numpy = import_numpy()
+        if method not in HASH_METHODS:
+            raise ValueError('Unknown hash method {}, use one of: {}'.format(method, ', '.join(HASH_METHODS)))
+        if format_id is None:
+            tf_format = self.select_thumbframe_format(min_frame_width=HASH_SIZE + 1, min_frame_height=HASH_SIZE)
+            if tf_format is None:
+                return numpy.empty(0, dtype=numpy.uint64)
+            format_id = tf_format.format_id
+
+        thumbframes_list = self._get_thumbframes_list(format_id)
+        raw_images = self._download_raw_images(thumbframes_list, max_workers=max_workers)
+        hashes = [numpy.empty(0, dtype=numpy.uint64)]
+        for tf_image, raw_image in zip(thumbframes_list, raw_images):
+            grid = frames_grid(decode_image(raw_image),
+                               tf_image.cols, tf_image.rows, tf_image.frame_width, tf_image.frame_height)
+            frames = grid.reshape((-1,) + grid.shape[2:])[:tf_image.n_frames]
+            hashes.append(HASH_METHODS[method](frames))
+        return numpy.concatenate(hashes)
+
+    def get_signature(self, length: int = 16, method: str = 'dhash') -> bytes:
+        """
+        Compact signature of the video made of the perceptual hashes of length frames evenly spaced across it.
+        Videos with a small signature_distance (see thumbframes_dl.hashing) are probably the same video.
+        See get_frame_hashes for the method parameter. Requires numpy and Pillow.
+
+        :raises ExtractorError
+        """
+        return video_signature(self.get_frame_hashes(method=method), length)
 
     def __repr__(self) -> str:
         return "<%s %s>" % (
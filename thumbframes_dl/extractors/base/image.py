@@ -1,43 +1,322 @@
-from typing import Optional
+import asyncio
+import http.client
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, Optional, Sequence, Union, overload
 
-from youtube_dl.YoutubeDL import YoutubeDL
-from youtube_dl.extractor.common import InfoExtractor
+from thumbframes_dl.cache import get_image_cache, url_cache_key
+from thumbframes_dl.imaging import decode_image, frames_grid, import_pil_image
+from thumbframes_dl.session import Session, get_default_session
+from thumbframes_dl.utils import ExtractorError
 
-from thumbframes_dl.utils import logger
+
+def _sniff_mime_type(raw_image: bytes) -> Optional[str]:
+    """
+    Guess an image's mime subtype from its first bytes.
+    """
+    if raw_image[:4] == b'RIFF' and raw_image[8:12] == b'WEBP':
+        return 'webp'
+    if raw_image[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    if raw_image[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if raw_image[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    return None
 
 
-class ThumbFramesImage(InfoExtractor):
+class ThumbFramesImage(object):
     """
     Each ThumbFramesImage represents a single image with n_frames frames arranged in a cols*rows grid.
     Note that different images may have different sizes and number of frames even if they're from the same video.
+    If known, frame_interval is the number of seconds of video between each frame and the next one.
+    All the images share the same Session to reuse connections, unless a different one is passed.
+    If the Session has a Cache, images are read from it before trying to download them.
     """
 
-    def __init__(self, url: str, width: int, height: int, cols: int, rows: int, n_frames: int):
-        self.set_downloader(YoutubeDL({'source_address': '0.0.0.0', 'logger': logger}))
+    __slots__ = ('_session', 'url', 'width', 'height', 'cols', 'rows', 'n_frames', 'frame_interval', 'mime_type')
+
+    def __init__(self, url: str, width: int, height: int, cols: int, rows: int, n_frames: int,
+                 frame_interval: Optional[float] = None, session: Optional[Session] = None):
+        self._session = session or get_default_session()
         self.url = url
         self.width = width
         self.height = height
         self.cols = cols
         self.rows = rows
         self.n_frames = n_frames
+        self.frame_interval = frame_interval
         self.mime_type: Optional[str] = None
-        self._image: Optional[bytes] = None
 
-    def get_image(self) -> bytes:
+    def to_dict(self) -> dict[str, Any]:
+        """
+        The image's metadata as a JSON-serializable dict, without the downloaded image.
+        """
+        return {
+            'url': self.url,
+            'width': self.width,
+            'height': self.height,
+            'cols': self.cols,
+            'rows': self.rows,
+            'n_frames': self.n_frames,
+            'frame_interval': self.frame_interval,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], session: Optional[Session] = None) -> 'ThumbFramesImage':
+        """
+        Restore an image from the dict returned by to_dict.
+        """
+        return cls(session=session, **data)
+
+    def get_image(self, keep: bool = True) -> bytes:
         """
         The raw image as bytes.
         Tries to download the image if it hasn't been already downloaded.
+        Downloaded images are kept in the process' image cache (see get_image_cache) so they aren't downloaded again
+        while there's room for them, unless keep is False.
 
         :raises ExtractorError
         """
-        if self._image is None:
-            resp = self._request_webpage(self.url, self.url, fatal=True)
-            raw_image = resp.read()
-            self.mime_type = resp.headers.get('Content-Type', '').split(';')[0].split('/')[1]
-            self._image = raw_image
-        return self._image
+        raw_image = self._get_cached_image(keep)
+        if raw_image is None:
+            raw_image = self._set_downloaded_image(*self._session.fetch(self.url), keep=keep)
+        return raw_image
+
+    async def async_get_image(self, keep: bool = True) -> bytes:
+        """
+        Same as get_image, but downloads the image with asyncio.
+
+        :raises ExtractorError
+        """
+        raw_image = self._get_cached_image(keep)
+        if raw_image is None:
+            raw_image = self._set_downloaded_image(*await self._session.async_fetch(self.url), keep=keep)
+        return raw_image
+
+    def _get_cached_image(self, keep: bool = True) -> Optional[bytes]:
+        key = url_cache_key(self.url)
+        raw_image = get_image_cache().get(key)
+        if raw_image is None and self._session.cache is not None:
+            raw_image = self._session.cache.get(key)
+            if raw_image is not None and keep:
+                get_image_cache().set(key, raw_image)
+        if raw_image is not None and self.mime_type is None:
+            self.mime_type = _sniff_mime_type(raw_image)
+        return raw_image
+
+    def _set_downloaded_image(self, raw_image: bytes, headers: http.client.HTTPMessage, keep: bool = True) -> bytes:
+        # responses without a valid Content-Type are sniffed instead
+        _, _, subtype = headers.get('Content-Type', '').split(';')[0].strip().partition('/')
+        self.mime_type = subtype or _sniff_mime_type(raw_image)
+        key = url_cache_key(self.url)
+        if keep:
+            get_image_cache().set(key, raw_image)
+        if self._session.cache is not None:
+            self._session.cache.set(key, raw_image)
+        return raw_image
+
+    @property
+    def frame_width(self) -> int:
+        return self.width // self.cols
+
+    @property
+    def frame_height(self) -> int:
+        return self.height // self.rows
+
+    def get_frame(self, row: int, col: int, as_pil: bool = False) -> Any:
+        """
+        Decode the image and get the frame in the given row and column.
+        See iter_frames for the type of the frame. Requires numpy and Pillow.
+
+        :raises ExtractorError
+        :raises IndexError if there's no frame in that position
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols and row * self.cols + col < self.n_frames):
+            raise IndexError('There is no frame in row {} and column {} of {}'.format(row, col, self))
+        grid = frames_grid(decode_image(self.get_image()), self.cols, self.rows, self.frame_width, self.frame_height)
+        return import_pil_image().fromarray(grid[row, col]) if as_pil else grid[row, col]
+
+    def iter_frames(self, as_pil: bool = False) -> Iterator[Any]:
+        """
+        Decode the image once and yield each one of its n_frames frames in order, row by row.
+        The frames are numpy arrays with shape (frame_height, frame_width, 3) that are views of the decoded image,
+        so no pixels are copied, or PIL images if as_pil is True.
+        Requires numpy and Pillow.
+
+        :raises ExtractorError
+        """
+        grid = frames_grid(decode_image(self.get_image()), self.cols, self.rows, self.frame_width, self.frame_height)
+        Image = import_pil_image() if as_pil else None
+        for i in range(min(self.n_frames, self.cols * self.rows)):
+            frame = grid[divmod(i, self.cols)]
+            yield Image.fromarray(frame) if Image else frame
 
     def __repr__(self) -> str:
         return "<%s: %sx%s image in a %sx%s grid>" % (
             self.__class__.__name__, self.width, self.height, self.cols, self.rows
         )
+
+
+class ThumbFramesImageList(Sequence[ThumbFramesImage]):
+    """
+    Read-only list of the ThumbFramesImages of a format whose images are numbered and share the same grid.
+    Every image has a full cols*rows grid of frames except the last one, which only has the remaining frames.
+    Only the URL template and the grid's shape are stored, and each ThumbFramesImage is created the first time
+    it's accessed, so the metadata of a format takes a few hundred bytes no matter how many images it has.
+    Each image's URL is url_template with every occurrence of placeholder replaced by the image's index,
+    followed by url_suffix, which is never searched for the placeholder.
+    """
+
+    __slots__ = ('_url_parts', '_placeholder', '_url_suffix', 'frame_width', 'frame_height', 'cols', 'rows',
+                 'total_frames', 'frame_interval', '_session', '_images')
+
+    def __init__(self, url_template: str, placeholder: str, frame_width: int, frame_height: int,
+                 cols: int, rows: int, total_frames: int, frame_interval: Optional[float] = None,
+                 session: Optional[Session] = None, url_suffix: str = ''):
+        self._url_parts = tuple(url_template.split(placeholder))
+        self._placeholder = placeholder
+        self._url_suffix = url_suffix
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.cols = cols
+        self.rows = rows
+        self.total_frames = total_frames
+        self.frame_interval = frame_interval
+        self._session = session
+        self._images: Optional[list[Optional[ThumbFramesImage]]] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        The list's metadata as a JSON-serializable dict, without any downloaded image.
+        """
+        return {
+            'url_template': self._placeholder.join(self._url_parts),
+            'placeholder': self._placeholder,
+            'url_suffix': self._url_suffix,
+            'frame_width': self.frame_width,
+            'frame_height': self.frame_height,
+            'cols': self.cols,
+            'rows': self.rows,
+            'total_frames': self.total_frames,
+            'frame_interval': self.frame_interval,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], session: Optional[Session] = None) -> 'ThumbFramesImageList':
+        """
+        Restore a list of images from the dict returned by to_dict.
+        """
+        return cls(session=session, **data)
+
+    def get_url(self, index: int) -> str:
+        """
+        URL of the image with index, without creating the image.
+        """
+        return str(index).join(self._url_parts) + self._url_suffix
+
+    def get_grid(self, index: int) -> tuple[int, int, int]:
+        """
+        Grid of the image with index as a tuple of (cols, rows, n_frames), without creating the image.
+        """
+        frames_per_image = self.cols * self.rows
+        n_frames = min(frames_per_image, self.total_frames - index * frames_per_image)
+        if n_frames == frames_per_image:
+            return self.cols, self.rows, n_frames
+        rows = int(math.ceil(n_frames / float(self.cols)))
+        return (n_frames if rows == 1 else self.cols), rows, n_frames
+
+    def __len__(self) -> int:
+        return int(math.ceil(self.total_frames / float(self.cols * self.rows)))
+
+    @overload
+    def __getitem__(self, index: int) -> ThumbFramesImage:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[ThumbFramesImage]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ThumbFramesImage, list[ThumbFramesImage]]:
+        n_images = len(self)
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(n_images))]
+        if index < 0:
+            index += n_images
+        if not 0 <= index < n_images:
+            raise IndexError('image index out of range')
+        if self._images is None:
+            self._images = [None] * n_images
+        tf_image = self._images[index]
+        if tf_image is None:
+            cols, rows, n_frames = self.get_grid(index)
+            tf_image = ThumbFramesImage(url=self.get_url(index),
+                                        width=cols * self.frame_width,
+                                        height=rows * self.frame_height,
+                                        cols=cols,
+                                        rows=rows,
+                                        n_frames=n_frames,
+                                        frame_interval=self.frame_interval,
+                                        session=self._session)
+            self._images[index] = tf_image
+        return tf_image
+
+    def __repr__(self) -> str:
+        return "<%s: %s images with %s %sx%s frames in a %sx%s grid>" % (
+            self.__class__.__name__,
+            len(self), self.total_frames, self.frame_width, self.frame_height, self.cols, self.rows
+        )
+
+
+def download_raw_images(images: Sequence[ThumbFramesImage], max_workers: int = 1
+                        ) -> list[Union[bytes, ExtractorError]]:
+    """
+    Download the raw bytes of many images at once, using a pool of up to max_workers threads.
+    Images that are still in the image cache are not downloaded again.
+    Returns the raw bytes of each image, or the error it raised, in the same order as the images.
+    The bytes are returned even if the image cache evicts them, so they can be used without downloading them again.
+    """
+
+    def _download(image: ThumbFramesImage) -> Union[bytes, ExtractorError]:
+        try:
+            return image.get_image()
+        except ExtractorError as e:
+            return e
+
+    if max_workers < 1:
+        raise ValueError('max_workers must be at least 1')
+
+    if max_workers == 1 or len(images) <= 1:
+        return [_download(image) for image in images]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(images))) as executor:
+        return list(executor.map(_download, images))
+
+
+def download_images(images: Sequence[ThumbFramesImage], max_workers: int = 1) -> list[Optional[ExtractorError]]:
+    """
+    Same as download_raw_images, but returns only the error raised by each image,
+    or None if the image was downloaded successfully.
+    """
+    return [result if isinstance(result, ExtractorError) else None
+            for result in download_raw_images(images, max_workers)]
+
+
+async def async_download_images(images: Sequence[ThumbFramesImage], max_concurrency: int = 8
+                                ) -> list[Optional[ExtractorError]]:
+    """
+    Same as download_images, but downloads the images with asyncio, up to max_concurrency at the same time.
+    """
+    if max_concurrency < 1:
+        raise ValueError('max_concurrency must be at least 1')
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _download(image: ThumbFramesImage) -> Optional[ExtractorError]:
+        async with semaphore:
+            try:
+                await image.async_get_image()
+            except ExtractorError as e:
+                return e
+            return None
+
+    return list(await asyncio.gather(*[_download(image) for image in images]))
@@ -1,13 +1,60 @@
-import math
+import json
+import re
 
-from typing import Optional
+from typing import Callable, Optional, Union
 
-from youtube_dl.utils import try_get, int_or_none
+from youtube_dl.compat import compat_HTTPError
+from youtube_dl.utils import float_or_none, try_get, update_url_query
 from youtube_dl.extractor.youtube import YoutubeIE
 
-from thumbframes_dl.utils import logger
+from thumbframes_dl.session import Session
+from thumbframes_dl.utils import logger, ExtractorError
 
-from .base import WebsiteFrames, ThumbFramesImage
+from .base import WebsiteFrames, ThumbFramesImageList
+from .youtube_spec import StoryboardSpec
+
+
+class _APIRequestRecorder(object):
+    """
+    Stand-in for a YoutubeIE that records the request built by youtube_dl's _call_api instead of sending it,
+    so calls to YouTube's API made with asyncio use the same URL, API key and client context as youtube_dl.
+    """
+
+    _DEFAULT_API_DATA = YoutubeIE._DEFAULT_API_DATA
+
+    def __init__(self) -> None:
+        self.request: Optional[tuple[str, bytes, dict[str, str]]] = None
+
+    def _download_json(self, url: str, video_id: str, *args, data: bytes = b'',
+                       headers: Optional[dict[str, str]] = None, query: Optional[dict[str, str]] = None, **kwargs):
+        self.request = (update_url_query(url, query or {}), data, dict(headers or {}))
+
+
+def _resume_offset(content: Union[bytes, bytearray], prefix: bytes, offset: int, endpos: int) -> int:
+    """
+    Offset where a search for a pattern that starts with prefix, which wasn't found in content[offset:endpos],
+    resumes once there's more content: the last occurrence of prefix, whose match may still be incomplete,
+    or else the last bytes, which may be an incomplete prefix.
+    """
+    last = content.rfind(prefix, offset, endpos)
+    return last if last != -1 else max(offset, endpos - len(prefix) + 1)
+
+
+class _SpecSearch(object):
+    """
+    Progress of the search for the storyboard spec in a webpage that's still being downloaded,
+    so each search resumes where the previous one stopped instead of scanning the whole webpage again.
+    start and end are the player response's offsets, or -1 while they haven't been found.
+    """
+
+    __slots__ = ('start', 'end', 'start_offset', 'end_offset', 'spec_offset')
+
+    def __init__(self) -> None:
+        self.start = -1
+        self.end = -1
+        self.start_offset = 0
+        self.end_offset = 0
+        self.spec_offset = 0
 
 
 class YouTubeFrames(WebsiteFrames, YoutubeIE):
@@ -22,12 +69,38 @@ class YouTubeFrames(WebsiteFrames, YoutubeIE):
 
     The image sizes may vary per video.
     Also, a video doesn't necessarily contain images in all the formats.
+
+    The fetch_strategy parameter sets how the thumbframes' metadata is downloaded:
+
+    * page: Download the video's page and call YouTube's API only if the page doesn't work. This is the default.
+    * api: Call YouTube's API and download the video's page only if the API doesn't work.
+    * stream: Same as page, but stop downloading the page as soon as the metadata is found.
     """
 
+    FETCH_PAGE = 'page'
+    FETCH_API = 'api'
+    FETCH_STREAM = 'stream'
+
     _YOUTUBE_URL = 'https://www.youtube.com'
     _VIDEO_WEBPAGE_URL = _YOUTUBE_URL + '/watch?v={VIDEO_ID}'
     _VIDEO_INFO_URL = _YOUTUBE_URL + '/get_video_info?video_id={VIDEO_ID}&el=detailpage'
 
+    _PLAYER_RESPONSE_START = b'ytInitialPlayerResponse'
+    _PLAYER_RESPONSE_START_RE = re.compile(re.escape(_PLAYER_RESPONSE_START) + rb'\s*=\s*\{')
+    _PLAYER_RESPONSE_END = b'</script'
+    _STORYBOARD_SPEC_START = b'"playerStoryboardSpecRenderer"'
+    _STORYBOARD_SPEC_RE = re.compile(re.escape(_STORYBOARD_SPEC_START)
+                                     + rb'\s*:\s*\{\s*"spec"\s*:\s*"((?:[^"\\]|\\.)*)"')
+    _LENGTH_SECONDS_RE = re.compile(rb'"lengthSeconds"\s*:\s*"(\d+)"')
+
+    def __init__(self, video_url: str, session: Optional[Session] = None, lazy: bool = False,
+                 fetch_strategy: str = FETCH_PAGE):
+        if fetch_strategy not in (self.FETCH_PAGE, self.FETCH_API, self.FETCH_STREAM):
+            raise ValueError('Unknown fetch strategy {}'.format(fetch_strategy))
+        self.fetch_strategy = fetch_strategy
+        self._spec_from_cache = False
+        super().__init__(video_url, session=session, lazy=lazy)
+
     def _validate(self) -> None:
         """:raises ExtractorError"""
         self._video_id = YoutubeIE.extract_id(self._input_url)
@@ -43,24 +116,146 @@ class YouTubeFrames(WebsiteFrames, YoutubeIE):
     def _get_storyboard_spec(self) -> Optional[str]:
         """
         Tries to extract storyboard spec from player_response object.
-        Storyboard spec is downloaded from video's page or an API endpoint.
+        Storyboard spec is downloaded from video's page or an API endpoint, in the order set by fetch_strategy.
+        """
+
+        video_id = self.video_id
+
+        if self.fetch_strategy == self.FETCH_API:
+            player_response = self._call_api('player', {'videoId': video_id}, video_id, fatal=False)
+            if player_response:
+                return self._get_spec_from_player_response(player_response)
+            return self._get_spec_from_webpage()[1]
+
+        if self.fetch_strategy == self.FETCH_STREAM:
+            found, sb_spec = self._stream_spec_from_webpage()
+        else:
+            found, sb_spec = self._get_spec_from_webpage()
+        if found:
+            return sb_spec
+
+        player_response = self._call_api(
+            'player', {'videoId': video_id}, video_id)
+        return self._get_spec_from_player_response(player_response)
+
+    async def _async_get_storyboard_spec(self) -> Optional[str]:
+        """
+        Same as _get_storyboard_spec, but downloads the page and calls the API with asyncio.
+        The stream fetch strategy downloads the whole page, same as the page strategy.
         """
 
         video_id = self.video_id
-        webpage_url = self._VIDEO_WEBPAGE_URL.format(VIDEO_ID=video_id)
 
-        webpage = self._download_webpage(
-            webpage_url + '&bpctr=9999999999', video_id, fatal=False)
+        if self.fetch_strategy == self.FETCH_API:
+            try:
+                return self._get_spec_from_player_response(await self._async_call_player_api())
+            except ExtractorError as e:
+                logger.warning('Unable to download API page of video {}: {}'.format(video_id, e))
+            return (await self._async_get_spec_from_webpage())[1]
+
+        found, sb_spec = await self._async_get_spec_from_webpage()
+        if found:
+            return sb_spec
+
+        return self._get_spec_from_player_response(await self._async_call_player_api())
 
-        player_response = None
-        if webpage:
-            player_response = self._extract_yt_initial_variable(
-                webpage, self._YT_INITIAL_PLAYER_RESPONSE_RE,
-                video_id, 'initial player response')
+    def _get_spec_from_webpage(self) -> tuple[bool, Optional[str]]:
+        """
+        Downloads the video's page and looks for the storyboard spec in it.
+        Returns whether the player response was found and the storyboard spec, if any.
+        """
+        webpage = self._download_webpage(self._get_webpage_url(), self.video_id, fatal=False)
+        if not webpage:
+            return False, None
+        return self._find_spec_in_webpage(webpage.encode('utf-8'), complete=True)  # type: ignore[return-value]
+
+    def _stream_spec_from_webpage(self) -> tuple[bool, Optional[str]]:
+        """
+        Same as _get_spec_from_webpage, but stops downloading the page as soon as the storyboard spec is found.
+        """
+        def _make_find() -> Callable[[bytearray], Optional[tuple[bool, Optional[str]]]]:
+            # each response is searched from the start
+            search = _SpecSearch()
+            return lambda content: self._find_spec_in_webpage(content, False, search)
+
+        try:
+            found = self._session.fetch_until(self._get_webpage_url(), _make_find)
+        except ExtractorError as e:
+            logger.warning('Unable to download webpage of video {}: {}'.format(self.video_id, e))
+            return False, None
+        return found or (False, None)
+
+    async def _async_get_spec_from_webpage(self) -> tuple[bool, Optional[str]]:
+        try:
+            webpage, _ = await self._session.async_fetch(self._get_webpage_url())
+        except ExtractorError as e:
+            logger.warning('Unable to download webpage of video {}: {}'.format(self.video_id, e))
+            return False, None
+        return self._find_spec_in_webpage(webpage, complete=True)  # type: ignore[return-value]
+
+    def _get_api_request(self, ep: str, query: dict) -> tuple[str, bytes, dict[str, str]]:
+        """
+        URL, body and headers of a call to YouTube's API, exactly as youtube_dl's _call_api would send them.
+        """
+        recorder = _APIRequestRecorder()
+        YoutubeIE._call_api(recorder, ep, query, self.video_id)
+        assert recorder.request is not None
+        return recorder.request
+
+    async def _async_call_player_api(self) -> Optional[dict]:
+        url, data, headers = self._get_api_request('player', {'videoId': self.video_id})
+        api_response, _ = await self._session.async_fetch(url, data=data, headers=headers)
+        return self._parse_json(api_response.decode('utf-8', 'replace'), self.video_id)
+
+    def _get_webpage_url(self) -> str:
+        return self._VIDEO_WEBPAGE_URL.format(VIDEO_ID=self.video_id) + '&bpctr=9999999999'
+
+    def _find_spec_in_webpage(self, webpage: Union[bytes, bytearray], complete: bool,
+                              search: Optional[_SpecSearch] = None) -> Optional[tuple[bool, Optional[str]]]:
+        """
+        Looks for the storyboard spec in the player response embedded in a webpage, which may be incomplete.
+        Only the storyboards' subtree is decoded. If it's not there, the whole player response is parsed.
+        Returns whether the player response was found and the storyboard spec, if any,
+        or None if the webpage is incomplete and more of it is needed.
+        When the same webpage is searched again with more content, passing the same search skips what was
+        already searched.
+        """
+        search = search or _SpecSearch()
+        if search.start == -1:
+            start_match = self._PLAYER_RESPONSE_START_RE.search(webpage, search.start_offset)
+            if start_match:
+                search.start = search.end_offset = search.spec_offset = start_match.start()
+            else:
+                search.start_offset = _resume_offset(webpage, self._PLAYER_RESPONSE_START,
+                                                     search.start_offset, len(webpage))
+        start = search.start
+        if start != -1 and search.end == -1:
+            search.end = webpage.find(self._PLAYER_RESPONSE_END, search.end_offset)
+            search.end_offset = max(start, len(webpage) - len(self._PLAYER_RESPONSE_END) + 1)
+        end = search.end
+        if start != -1:
+            spec_end = end if end != -1 else len(webpage)
+            spec_match = self._STORYBOARD_SPEC_RE.search(webpage, search.spec_offset, spec_end)
+            if spec_match:
+                duration_match = self._LENGTH_SECONDS_RE.search(webpage, start, spec_match.start())
+                self._duration = float(duration_match.group(1)) if duration_match else None
+                return True, json.loads(b'"' + spec_match.group(1) + b'"')
+            search.spec_offset = _resume_offset(webpage, self._STORYBOARD_SPEC_START, search.spec_offset, spec_end)
+
+        if not complete and (start == -1 or end == -1):
+            return None  # player response may not have been downloaded yet
+
+        # storyboards not found, parse the whole player response
+        player_response = self._extract_yt_initial_variable(
+            webpage.decode('utf-8', 'replace'), self._YT_INITIAL_PLAYER_RESPONSE_RE,
+            self.video_id, 'initial player response')
         if not player_response:
-            player_response = self._call_api(
-                'player', {'videoId': video_id}, video_id)
+            return False, None
+        return True, self._get_spec_from_player_response(player_response)
 
+    def _get_spec_from_player_response(self, player_response: Optional[dict]) -> Optional[str]:
+        if player_response:
+            self._duration = float_or_none(try_get(player_response, lambda x: x['videoDetails']['lengthSeconds']))
         if player_response and 'storyboards' in player_response:
             return try_get(player_response,
                            lambda x: x['storyboards']['playerStoryboardSpecRenderer']['spec'],
@@ -68,67 +263,59 @@ class YouTubeFrames(WebsiteFrames, YoutubeIE):
 
         return None  # storyboard spec not found anywhere in page
 
-    def _get_storyboards_from_spec(self, sb_spec: str) -> dict[str, list[ThumbFramesImage]]:
+    def _get_storyboards_from_spec(self, sb_spec: str) -> dict[str, ThumbFramesImageList]:
         """
         Tries to extract information for each storyboard
         by parsing the extracted storyboard spec.
         """
 
-        storyboards: dict[str, list[ThumbFramesImage]] = {}
-
-        s_parts = sb_spec.split('|')
-        base_url = s_parts[0]
-        for i, params in enumerate(s_parts[1:]):
-            storyboard_attrib = params.split('#')
-            if len(storyboard_attrib) != 8:
-                logger.warning('Unable to extract thumbframe from spec {}'.format(params))
-                continue
-
-            frame_width = int_or_none(storyboard_attrib[0])
-            frame_height = int_or_none(storyboard_attrib[1])
-            total_frames = int_or_none(storyboard_attrib[2])
-            cols = int_or_none(storyboard_attrib[3])
-            rows = int_or_none(storyboard_attrib[4])
-            filename = storyboard_attrib[6]
-            sigh = storyboard_attrib[7]
-
-            if frame_width and frame_height and cols and rows and total_frames:
-                frames = cols * rows
-                width, height = frame_width * cols, frame_height * rows
-                n_images = int(math.ceil(total_frames / float(cols * rows)))
-            else:
-                logger.warning('Unable to extract thumbframe from spec {}'.format(params))
-                continue
-
-            storyboard_set: list[ThumbFramesImage] = []
-            storyboards_url = base_url.replace('$L', str(i)) + '&'
-            for j in range(n_images):
-                url = storyboards_url.replace('$N', filename).replace('$M', str(j)) + 'sigh=' + sigh
-                if j == n_images - 1:
-                    remaining_frames = total_frames % (cols * rows)
-                    if remaining_frames != 0:
-                        frames = remaining_frames
-                        rows = int(math.ceil(float(remaining_frames) / rows))
-                        height = rows * frame_height
-                        if rows == 1:
-                            cols = remaining_frames
-                            width = cols * frame_width
-
-                storyboard_set.append(
-                    ThumbFramesImage(
-                        url=url,
-                        width=width,
-                        height=height,
-                        cols=cols,
-                        rows=rows,
-                        n_frames=frames)
-                )
-            storyboards['L{}'.format(i)] = storyboard_set
-
-        return storyboards
-
-    def download_thumbframe_info(self) -> dict[str, list[ThumbFramesImage]]:
-        sb_spec = self._get_storyboard_spec()
+        spec = StoryboardSpec(sb_spec)
+
+        # if the video's duration is unknown, estimate it with the levels that have a fixed interval between frames
+        if self._duration is None:
+            self._duration = spec.estimated_duration
+
+        return {level.format_id: level.to_image_list(self._duration, self._session) for level in spec.levels}
+
+    def _get_cached_storyboard_spec(self) -> Optional[str]:
+        cached_storyboards = self._get_cached_metadata('storyboards')
+        if cached_storyboards is None:
+            return None
+        storyboards = json.loads(cached_storyboards)
+        self._duration = storyboards.get('duration')
+        self._spec_from_cache = True
+        return storyboards['spec']
+
+    def _set_cached_storyboard_spec(self, sb_spec: str) -> None:
+        self._set_cached_metadata('storyboards', json.dumps({'spec': sb_spec, 'duration': self._duration}))
+
+    def _on_image_error(self, error: ExtractorError) -> None:
+        # the images' signatures in a cached spec may have expired, so the spec is downloaded again next time
+        if (self._spec_from_cache and isinstance(error.cause, compat_HTTPError)
+                and not self._session.retry_policy.should_retry(error)):
+            logger.warning('Removing cached thumbframes of video {}, which may be stale: {}'.format(
+                self.video_id, error))
+            self._delete_cached_metadata('storyboards')
+            self._spec_from_cache = False
+
+    def download_thumbframe_info(self) -> dict[str, ThumbFramesImageList]:
+        sb_spec = self._get_cached_storyboard_spec()
+        if sb_spec is None:
+            sb_spec = self._get_storyboard_spec()
+            if sb_spec:
+                self._set_cached_storyboard_spec(sb_spec)
+        if not sb_spec:
+            logger.warning('Could not find thumbframes for video {}'.format(self.video_id))
+            return dict()
+
+        return self._get_storyboards_from_spec(sb_spec)
+
+    async def async_download_thumbframe_info(self) -> dict[str, ThumbFramesImageList]:
+        sb_spec = self._get_cached_storyboard_spec()
+        if sb_spec is None:
+            sb_spec = await self._async_get_storyboard_spec()
+            if sb_spec:
+                self._set_cached_storyboard_spec(sb_spec)
         if not sb_spec:
             logger.warning('Could not find thumbframes for video {}'.format(self.video_id))
             return dict()
@@ -0,0 +1,127 @@
+"""
+Parser of YouTube's storyboard specs, which describe all the thumbframes formats of a video in a single string:
+a base URL followed by one level per format, separated by |, with each level's attributes separated by #.
+The spec is tokenized once and each level's URL template is built once, so no image is created while parsing.
+"""
+import re
+
+from typing import Iterator, Optional
+
+from youtube_dl.utils import int_or_none
+
+from thumbframes_dl.session import Session
+from thumbframes_dl.utils import logger
+
+from .base import ThumbFramesImageList
+
+
+_URL_TOKENS_RE = re.compile(r'(\$L|\$N)')
+
+
+class StoryboardLevel(object):
+    """
+    A level of a storyboard spec, which is a thumbframes format whose images are numbered and share the same grid.
+    interval is the number of milliseconds of video between each frame and the next one,
+    or 0 if the frames are spread evenly across the whole video.
+    Each image's URL is url_template with PLACEHOLDER replaced by the image's index, followed by url_suffix.
+    """
+
+    PLACEHOLDER = '$M'
+
+    __slots__ = ('level', 'url_template', 'url_suffix', 'frame_width', 'frame_height', 'total_frames',
+                 'cols', 'rows', 'interval')
+
+    def __init__(self, level: int, url_template: str, url_suffix: str, frame_width: int, frame_height: int,
+                 total_frames: int, cols: int, rows: int, interval: int):
+        self.level = level
+        self.url_template = url_template
+        self.url_suffix = url_suffix
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.total_frames = total_frames
+        self.cols = cols
+        self.rows = rows
+        self.interval = interval
+
+    @property
+    def format_id(self) -> str:
+        return 'L{}'.format(self.level)
+
+    def get_frame_interval(self, duration: Optional[float] = None) -> Optional[float]:
+        """
+        Number of seconds of video between each frame and the next one.
+        Levels without a fixed interval need the video's duration, and return None if it's unknown.
+        """
+        if self.interval:
+            return self.interval / 1000.0
+        return duration / self.total_frames if duration else None
+
+    def to_image_list(self, duration: Optional[float] = None, session: Optional[Session] = None
+                      ) -> ThumbFramesImageList:
+        """
+        The level's images as a ThumbFramesImageList, which creates each image only when it's accessed.
+        """
+        return ThumbFramesImageList(
+            url_template=self.url_template,
+            placeholder=self.PLACEHOLDER,
+            url_suffix=self.url_suffix,
+            frame_width=self.frame_width,
+            frame_height=self.frame_height,
+            cols=self.cols,
+            rows=self.rows,
+            total_frames=self.total_frames,
+            frame_interval=self.get_frame_interval(duration),
+            session=session)
+
+    def __repr__(self) -> str:
+        return "<%s %s: %s %sx%s frames in a %sx%s grid>" % (
+            self.__class__.__name__, self.format_id,
+            self.total_frames, self.frame_width, self.frame_height, self.cols, self.rows
+        )
+
+
+class StoryboardSpec(object):
+    """
+    A parsed storyboard spec, with a StoryboardLevel for each of its valid levels.
+    Levels that can't be parsed are skipped with a warning.
+    """
+
+    __slots__ = ('levels',)
+
+    def __init__(self, sb_spec: str):
+        self.levels = list(self._parse_levels(sb_spec))
+
+    @staticmethod
+    def _parse_levels(sb_spec: str) -> Iterator[StoryboardLevel]:
+        base_url, *levels_params = sb_spec.split('|')
+        # the base URL's $L (level) and $N (file name) placeholders are found only once for all the levels
+        url_tokens = _URL_TOKENS_RE.split(base_url)
+
+        for level, params in enumerate(levels_params):
+            attribs = params.split('#')
+            if len(attribs) != 8:
+                logger.warning('Unable to extract thumbframe from spec {}'.format(params))
+                continue
+
+            frame_width, frame_height, total_frames, cols, rows, interval = map(int_or_none, attribs[:6])
+            filename, sigh = attribs[6], attribs[7]
+            if not (frame_width and frame_height and cols and rows and total_frames):
+                logger.warning('Unable to extract thumbframe from spec {}'.format(params))
+                continue
+
+            url_template = ''.join(str(level) if token == '$L' else filename if token == '$N' else token
+                                   for token in url_tokens)
+            # the signature is kept as a suffix so it's never mistaken for the $M placeholder
+            yield StoryboardLevel(level, url_template + '&', 'sigh=' + sigh, frame_width, frame_height,
+                                  total_frames, cols, rows, interval or 0)
+
+    @property
+    def estimated_duration(self) -> Optional[float]:
+        """
+        Duration of the video in seconds, estimated with the levels that have a fixed interval between frames,
+        or None if no level has one.
+        """
+        return max([level.interval * level.total_frames / 1000.0 for level in self.levels] or [0]) or None
+
+    def __repr__(self) -> str:
+        return "<%s: %s>" % (self.__class__.__name__, ', '.join(level.format_id for level in self.levels))
@@ -0,0 +1,110 @@
+"""
+Perceptual hashes of frames, to find near-duplicate frames and videos.
+Each hash is a 64 bits unsigned integer, and similar frames have hashes with a small Hamming distance.
+All the functions work on many frames at once. This module requires numpy.
+"""
+from typing import TYPE_CHECKING
+
+from thumbframes_dl.imaging import import_numpy
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+HASH_SIZE = 8
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+
+def _grayscale(frames: 'np.ndarray') -> 'np.ndarray':
+    """
+    Luminance of an array of frames with shape (n_frames, height, width, channels), or the same array if
+    it's already grayscale with shape (n_frames, height, width).
+    """
+    numpy = import_numpy()
+    if frames.ndim == 3:
+        return frames.astype(numpy.float32)
+    return frames[..., :3].astype(numpy.float32) @ numpy.array([0.299, 0.587, 0.114], dtype=numpy.float32)
+
+
+def _block_means(gray: 'np.ndarray', rows: int, cols: int) -> 'np.ndarray':
+    """
+    Shrink an array of grayscale frames to rows*cols pixels each, by averaging blocks of pixels.
+    """
+    numpy = import_numpy()
+    height, width = gray.shape[1:3]
+    if height < rows or width < cols:
+        raise ValueError('Frames must be at least {}x{} pixels to be hashed'.format(cols, rows))
+    row_starts = numpy.arange(rows) * height // rows
+    col_starts = numpy.arange(cols) * width // cols
+    sums = numpy.add.reduceat(numpy.add.reduceat(gray, row_starts, axis=1), col_starts, axis=2)
+    counts = numpy.outer(numpy.diff(numpy.append(row_starts, height)), numpy.diff(numpy.append(col_starts, width)))
+    return sums / counts
+
+
+def _pack_bits(bits: 'np.ndarray') -> 'np.ndarray':
+    numpy = import_numpy()
+    packed = numpy.packbits(bits.reshape(bits.shape[0], HASH_BITS), axis=1)
+    return packed.view('>u8').ravel().astype(numpy.uint64)
+
+
+def average_hash(frames: 'np.ndarray') -> 'np.ndarray':
+    """
+    aHash of each frame in an array with shape (n_frames, height, width, channels), as an array of uint64.
+    Each bit tells whether a block of the frame is brighter than the frame's average.
+    """
+    means = _block_means(_grayscale(frames), HASH_SIZE, HASH_SIZE)
+    return _pack_bits(means > means.mean(axis=(1, 2), keepdims=True))
+
+
+def difference_hash(frames: 'np.ndarray') -> 'np.ndarray':
+    """
+    dHash of each frame in an array with shape (n_frames, height, width, channels), as an array of uint64.
+    Each bit tells whether a block of the frame is brighter than the block to its left.
+    """
+    means = _block_means(_grayscale(frames), HASH_SIZE, HASH_SIZE + 1)
+    return _pack_bits(means[:, :, 1:] > means[:, :, :-1])
+
+
+HASH_METHODS = {
+    'ahash': average_hash,
+    'dhash': difference_hash,
+}
+
+
+def hamming_distance(hashes: 'np.ndarray', other_hashes: 'np.ndarray') -> 'np.ndarray':
+    """
+    Number of different bits between each pair of hashes.
+    """
+    numpy = import_numpy()
+    different_bits = numpy.asarray(hashes, dtype=numpy.uint64) ^ numpy.asarray(other_hashes, dtype=numpy.uint64)
+    different_bytes = numpy.atleast_1d(different_bits).astype('>u8').view(numpy.uint8).reshape(-1, 8)
+    distances = numpy.unpackbits(different_bytes, axis=1).sum(axis=1)
+    return distances.reshape(numpy.shape(different_bits))
+
+
+def video_signature(hashes: 'np.ndarray', length: int = 16) -> bytes:
+    """
+    Compact signature of a video made of the hashes of length frames evenly spaced across all its frames,
+    so videos with a different number of frames can still be compared.
+    """
+    numpy = import_numpy()
+    if len(hashes) == 0:
+        return b''
+    indexes = ((numpy.arange(length) + 0.5) * len(hashes) / length).astype(numpy.int64)
+    return numpy.asarray(hashes, dtype=numpy.uint64)[indexes].astype('>u8').tobytes()
+
+
+def signature_distance(signature: bytes, other_signature: bytes) -> float:
+    """
+    Fraction of different bits between two video signatures with the same length, from 0 (same frames) to 1.
+
+    :raises ValueError if the signatures have different lengths
+    """
+    numpy = import_numpy()
+    if len(signature) != len(other_signature):
+        raise ValueError('Signatures must have the same length')
+    if not signature:
+        return 0.0
+    distances = hamming_distance(numpy.frombuffer(signature, dtype='>u8'),
+                                 numpy.frombuffer(other_signature, dtype='>u8'))
+    return float(distances.sum()) / (len(distances) * HASH_BITS)
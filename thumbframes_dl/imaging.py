@@ -0,0 +1,76 @@
+"""
+Decoding of thumbframes images into arrays of frames.
+This module requires numpy and Pillow, which can be installed with `pip install thumbframes_dl[frames]`.
+"""
+from io import BytesIO
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def import_numpy() -> ModuleType:
+    """
+    :raises ImportError with installation instructions if numpy isn't installed
+    """
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError('numpy is required to decode thumbframes. '
+                          'Install it with: pip install thumbframes_dl[frames]') from e
+    return numpy
+
+
+def import_pil_image() -> ModuleType:
+    """
+    :raises ImportError with installation instructions if Pillow isn't installed
+    """
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise ImportError('Pillow is required to decode thumbframes. '
+                          'Install it with: pip install thumbframes_dl[frames]') from e
+    return Image
+
+
+def decode_image(raw_image: bytes) -> 'np.ndarray':
+    """
+    Decode a raw image into an RGB array with shape (height, width, 3).
+    """
+    numpy = import_numpy()
+    Image = import_pil_image()
+    with Image.open(BytesIO(raw_image)) as image:
+        return numpy.asarray(image.convert('RGB'))
+
+
+def frames_grid(image_array: 'np.ndarray', cols: int, rows: int, frame_width: int, frame_height: int
+                ) -> 'np.ndarray':
+    """
+    View of an image's array as a grid of frames with shape (rows, cols, frame_height, frame_width, channels),
+    so grid[row, col] is the frame in that cell. No pixels are copied.
+    If the image is smaller than expected, the frame size is reduced to fit the grid in the image.
+    """
+    frame_height = min(frame_height, image_array.shape[0] // rows)
+    frame_width = min(frame_width, image_array.shape[1] // cols)
+    channels = image_array.shape[2]
+    grid = image_array[:rows * frame_height, :cols * frame_width]
+    return grid.reshape(rows, frame_height, cols, frame_width, channels).transpose(0, 2, 1, 3, 4)
+
+
+def copy_grid_frames(grid: 'np.ndarray', out: 'np.ndarray') -> None:
+    """
+    Copy the first len(out) frames of a grid of frames, as returned by frames_grid, into out,
+    an array with shape (n_frames, frame_height, frame_width, channels).
+    Frames are copied a whole row of the grid at a time.
+    If the grid's frames are smaller than out's frames, they're copied to the top left corner.
+    """
+    n_frames = out.shape[0]
+    cols = grid.shape[1]
+    frame_height, frame_width = grid.shape[2:4]
+    full_rows, remaining_frames = divmod(n_frames, cols)
+    if full_rows:
+        out_rows = out[:full_rows * cols].reshape((full_rows, cols) + out.shape[1:])
+        out_rows[:, :, :frame_height, :frame_width] = grid[:full_rows]
+    if remaining_frames:
+        out[full_rows * cols:, :frame_height, :frame_width] = grid[full_rows, :remaining_frames]
@@ -0,0 +1,68 @@
+"""
+Animated previews of videos made from their thumbframes.
+Images are downloaded and decoded one at a time, so only the preview's frames are kept in memory,
+already subsampled and resized. This module requires numpy and Pillow.
+"""
+from typing import IO, TYPE_CHECKING, Any, Iterator, Optional, Union
+
+from thumbframes_dl.imaging import decode_image, frames_grid, import_pil_image
+from thumbframes_dl.utils import ExtractorError
+
+if TYPE_CHECKING:
+    from thumbframes_dl.extractors.base import WebsiteFrames
+
+
+def iter_preview_frames(video: 'WebsiteFrames', format_id: Optional[str] = None, step: int = 1,
+                        size: Optional[tuple[int, int]] = None, prefetch: int = 4) -> Iterator[Any]:
+    """
+    Yield every step-th frame of the video's thumbframes as a PIL image, resized to size if it's set.
+    Images are streamed with WebsiteFrames.iter_thumbframes, downloading up to prefetch images ahead,
+    and each one is released as soon as its frames are yielded.
+    The format_id parameter works the same as in WebsiteFrames.get_thumbframes.
+
+    :raises ExtractorError
+    """
+    if step < 1:
+        raise ValueError('step must be at least 1')
+    Image = import_pil_image()
+    first_frame = 0
+    for tf_image, raw_image in video.iter_thumbframes(format_id, prefetch=prefetch):
+        # index of the first frame in this image that's part of the preview
+        start = -first_frame % step
+        first_frame += tf_image.n_frames
+        if start >= tf_image.n_frames:
+            continue
+        grid = frames_grid(decode_image(raw_image), tf_image.cols, tf_image.rows,
+                           tf_image.frame_width, tf_image.frame_height)
+        for i in range(start, min(tf_image.n_frames, tf_image.cols * tf_image.rows), step):
+            frame = Image.fromarray(grid[divmod(i, tf_image.cols)])
+            yield frame.resize(size) if size else frame
+
+
+def save_preview(video: 'WebsiteFrames', fp: Union[str, IO[bytes]], format_id: Optional[str] = None,
+                 image_format: str = 'WEBP', fps: float = 10.0, step: int = 1, size: Optional[tuple[int, int]] = None,
+                 loop: int = 0, prefetch: int = 4, **options) -> None:
+    """
+    Save an animated preview of the video in fp, a file name or a file object, as a WEBP or GIF image.
+    The preview shows every step-th frame at fps frames per second, resized to size if it's set,
+    and it's repeated loop times, or forever if loop is 0.
+    If neither format_id nor size are set, the highest resolution format is used. If only size is set,
+    the cheapest format with frames of at least that size is used (see WebsiteFrames.select_thumbframe_format).
+    Any other keyword arguments, like quality, are passed to Pillow's encoder.
+
+    :raises ExtractorError if the video has no thumbframes or its images can't be downloaded
+    """
+    if fps <= 0:
+        raise ValueError('fps must be positive')
+    if format_id is None and size is not None:
+        tf_format = video.select_thumbframe_format(min_frame_width=size[0], min_frame_height=size[1])
+        format_id = tf_format.format_id if tf_format else None
+
+    frames = iter_preview_frames(video, format_id, step=step, size=size, prefetch=prefetch)
+    first_frame = next(frames, None)
+    if first_frame is None:
+        raise ExtractorError('Video {} has no thumbframes to make a preview'.format(video.video_id),
+                             video_id=video.video_id, expected=True)
+    # Pillow's encoders need all the frames at once, which are only the small frames of the preview
+    first_frame.save(fp, format=image_format, save_all=True, append_images=list(frames),
+                     duration=int(round(1000 / fps)), loop=loop, **options)
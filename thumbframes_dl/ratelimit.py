@@ -0,0 +1,164 @@
+import asyncio
+import http.client
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlsplit
+
+from youtube_dl.compat import compat_HTTPError
+
+from thumbframes_dl.utils import logger, ExtractorError
+
+
+T = TypeVar('T')
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket that allows up to rate operations per second on average,
+    with bursts of up to capacity operations.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last_update = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_update) * self.rate)
+        self._last_update = now
+
+    def _reserve(self) -> float:
+        """
+        Take a token from the bucket and return how many seconds to wait until it's actually available.
+        Tokens are reserved before waiting, so waiting callers are served in order.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0
+
+    def acquire(self) -> None:
+        """
+        Take a token from the bucket, blocking until one is available.
+        """
+        wait_time = self._reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def async_acquire(self) -> None:
+        """
+        Same as acquire, but waits with asyncio.
+        """
+        wait_time = self._reserve()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+
+class RetryPolicy(object):
+    """
+    How a Session's downloads are throttled and retried.
+    A download that fails because of a network error, such as a timeout, or with an HTTP status in retry_statuses
+    is tried again up to max_retries times. Before each retry, it waits a random time between 0 and
+    backoff * 2 ** retry seconds (exponential backoff with full jitter), or the time asked by the server's
+    Retry-After header if that's longer, but never more than max_backoff seconds.
+    If rate_limit is set, no more than rate_limit requests per second are sent to each host,
+    with bursts of up to burst requests.
+    """
+
+    RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+    def __init__(self, max_retries: int = 2, backoff: float = 0.5, max_backoff: float = 30.0,
+                 rate_limit: Optional[float] = None, burst: float = 1, retry_statuses=RETRY_STATUSES):
+        if max_retries < 0:
+            raise ValueError('max_retries must not be negative')
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.retry_statuses = frozenset(retry_statuses)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, url: str) -> Optional[TokenBucket]:
+        if not self.rate_limit:
+            return None
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate_limit, capacity=self.burst)
+            return bucket
+
+    def should_retry(self, error: ExtractorError) -> bool:
+        """
+        Whether a download that failed with error may succeed if it's tried again.
+        """
+        cause = error.cause
+        if isinstance(cause, compat_HTTPError):
+            return cause.code in self.retry_statuses
+        return isinstance(cause, (OSError, http.client.HTTPException, asyncio.TimeoutError,
+                                  asyncio.IncompleteReadError))
+
+    def get_delay(self, retry: int, error: Optional[ExtractorError] = None) -> float:
+        """
+        Seconds to wait before trying again a download that failed with error, after retry previous retries.
+        """
+        delay = random.uniform(0, self.backoff * 2 ** retry)
+        cause = error.cause if error is not None else None
+        if isinstance(cause, compat_HTTPError) and cause.headers is not None:
+            retry_after = cause.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+        return min(delay, self.max_backoff)
+
+    def call(self, url: str, download: Callable[[], T]) -> T:
+        """
+        Call download, which downloads url, applying this policy's rate limit and retries.
+
+        :raises ExtractorError raised by the last try
+        """
+        bucket = self._get_bucket(url)
+        retry = 0
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                return download()
+            except ExtractorError as e:
+                if retry >= self.max_retries or not self.should_retry(e):
+                    raise
+                delay = self.get_delay(retry, e)
+                logger.debug('Retrying {} in {:.2f} seconds: {}'.format(url, delay, e))
+                time.sleep(delay)
+                retry += 1
+
+    async def async_call(self, url: str, download: Callable[[], Awaitable[T]]) -> T:
+        """
+        Same as call, but for a download made with asyncio.
+
+        :raises ExtractorError raised by the last try
+        """
+        bucket = self._get_bucket(url)
+        retry = 0
+        while True:
+            if bucket is not None:
+                await bucket.async_acquire()
+            try:
+                return await download()
+            except ExtractorError as e:
+                if retry >= self.max_retries or not self.should_retry(e):
+                    raise
+                delay = self.get_delay(retry, e)
+                logger.debug('Retrying {} in {:.2f} seconds: {}'.format(url, delay, e))
+                await asyncio.sleep(delay)
+                retry += 1
@@ -0,0 +1,88 @@
+"""
+Detection of scene changes in a sequence of frames, such as the frames returned by WebsiteFrames.get_frames_array.
+The differences between consecutive frames are computed in chunks of frames at once.
+This module requires numpy.
+"""
+from typing import TYPE_CHECKING
+
+from thumbframes_dl.imaging import import_numpy
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# frames processed at once, so the intermediate arrays take a fixed amount of memory no matter the video's length
+CHUNK_FRAMES = 32
+
+
+def _histograms(frames: 'np.ndarray', bins: int) -> 'np.ndarray':
+    """
+    Normalized color histogram of each frame, with shape (n_frames, channels, bins).
+    """
+    numpy = import_numpy()
+    n_frames, channels = frames.shape[0], frames.shape[-1]
+    histograms = numpy.empty((n_frames, channels, bins))
+    for start in range(0, n_frames, CHUNK_FRAMES):
+        chunk = frames[start:start + CHUNK_FRAMES]
+        chunk_frames = chunk.shape[0]
+        bin_indexes = chunk.reshape(chunk_frames, -1, channels).astype(numpy.int32)
+        bin_indexes *= bins
+        bin_indexes //= 256
+        # each frame and channel has its own range of bins, so all the chunk's histograms are counted at once
+        bin_indexes += ((numpy.arange(chunk_frames, dtype=numpy.int32)[:, None, None] * channels
+                         + numpy.arange(channels, dtype=numpy.int32)[None, None, :]) * bins)
+        counts = numpy.bincount(bin_indexes.ravel(), minlength=chunk_frames * channels * bins)
+        histograms[start:start + chunk_frames] = counts.reshape(chunk_frames, channels, bins) / bin_indexes.shape[1]
+    return histograms
+
+
+def frame_differences(frames: 'np.ndarray', method: str = 'histogram', bins: int = 16) -> 'np.ndarray':
+    """
+    Difference between each frame and the next one, from 0 (same frames) to 1,
+    for an array of frames with shape (n_frames, height, width, channels).
+    The 'histogram' method compares the frames' color histograms with bins bins per channel,
+    so it ignores movement within the same scene, while the 'pixel' method compares the frames pixel by pixel.
+    Frames are processed in chunks of CHUNK_FRAMES frames, so long videos don't need much more memory than
+    their frames. Returns an array with n_frames - 1 differences.
+
+    :raises ValueError if the method is unknown
+    """
+    numpy = import_numpy()
+    if method not in ('histogram', 'pixel'):
+        raise ValueError('Unknown method {}, use histogram or pixel'.format(method))
+    if len(frames) < 2:
+        return numpy.empty(0)
+    if method == 'histogram':
+        histograms = _histograms(frames, bins)
+        return numpy.abs(histograms[1:] - histograms[:-1]).sum(axis=2).mean(axis=1) / 2
+
+    differences = numpy.empty(len(frames) - 1)
+    for start in range(0, len(frames) - 1, CHUNK_FRAMES):
+        # each chunk overlaps the next one by a frame, to compare the frames at their border
+        pixels = frames[start:start + CHUNK_FRAMES + 1].reshape(
+            min(CHUNK_FRAMES + 1, len(frames) - start), -1).astype(numpy.int16)
+        differences[start:start + len(pixels) - 1] = numpy.abs(pixels[1:] - pixels[:-1]).mean(axis=1) / 255
+    return differences
+
+
+def detect_scenes(frames: 'np.ndarray', threshold: float = 0.3, method: str = 'histogram', bins: int = 16,
+                  min_scene_length: int = 1) -> 'np.ndarray':
+    """
+    Index of the first frame of each scene after the first one, for an array of frames with shape
+    (n_frames, height, width, channels). A new scene starts at each frame whose difference with the previous
+    frame is over threshold, unless the current scene has less than min_scene_length frames.
+    See frame_differences for the method and bins parameters.
+
+    :raises ValueError if the method is unknown
+    """
+    numpy = import_numpy()
+    cuts = numpy.flatnonzero(frame_differences(frames, method, bins) > threshold) + 1
+    if min_scene_length <= 1 or len(cuts) == 0:
+        return cuts
+    kept_cuts = []
+    scene_start = 0
+    for cut in cuts:
+        if cut - scene_start >= min_scene_length:
+            kept_cuts.append(cut)
+            scene_start = cut
+    return numpy.array(kept_cuts, dtype=cuts.dtype)
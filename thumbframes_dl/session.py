@@ -0,0 +1,383 @@
+import asyncio
+import base64
+import functools
+import http.client
+import io
+import socket
+import ssl
+import threading
+import urllib.request
+import urllib.response
+from typing import Callable, Optional, TypeVar
+from urllib.parse import SplitResult, unquote, urljoin, urlsplit
+
+from youtube_dl.YoutubeDL import YoutubeDL
+from youtube_dl.compat import compat_HTTPError
+from youtube_dl.utils import std_headers
+
+from thumbframes_dl.cache import Cache
+from thumbframes_dl.ratelimit import RetryPolicy
+from thumbframes_dl.utils import logger, ExtractorError
+
+
+T = TypeVar('T')
+
+
+def _create_ipv4_connection(address: tuple[str, int], timeout: float, source_address=None) -> socket.socket:
+    """
+    Like socket.create_connection, but only connects through IPv4, same as YoutubeDL with source_address 0.0.0.0
+    """
+    host, port = address
+    error: Optional[OSError] = None
+    for family, socktype, proto, _, sockaddr in socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_STREAM):
+        sock = None
+        try:
+            sock = socket.socket(family, socktype, proto)
+            sock.settimeout(timeout)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            error = e
+            if sock is not None:
+                sock.close()
+    raise error or OSError('getaddrinfo returned an empty list')
+
+
+class Session(object):
+    """
+    Shared downloader for videos and their thumbframes images.
+    It holds a single YoutubeDL object, used by the extractors to download webpages and call APIs,
+    and a pool of keep-alive HTTP connections, used to download images from the same host without reconnecting.
+    A Session can be shared by many videos and it's safe to use from many threads.
+    It can also download content natively with asyncio, so many downloads can share one event loop.
+    If a Cache is set, the videos' metadata and images are read from it before trying to download them.
+    Every request times out after timeout seconds, and all the downloads are throttled and retried
+    according to retry_policy, which by default retries a couple of times without any rate limit.
+    Same as in YoutubeDL, proxy is the URL of an HTTP proxy for all the downloads, or an empty string
+    to not use any proxy. If it's None, the proxies in the environment's variables, like HTTPS_PROXY, are used
+    for the hosts that aren't in NO_PROXY. Images also send and receive the cookies in YoutubeDL's cookie jar.
+    """
+
+    _MAX_REDIRECTS = 5
+
+    def __init__(self, pool_size: int = 8, timeout: float = 20.0, cache: Optional[Cache] = None,
+                 retry_policy: Optional[RetryPolicy] = None, proxy: Optional[str] = None):
+        params = {'source_address': '0.0.0.0', 'socket_timeout': timeout, 'logger': logger}
+        if proxy is not None:
+            params['proxy'] = proxy
+        self.downloader = YoutubeDL(params)
+        self.proxy = proxy
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._idle_connections: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _get_proxy(self, scheme: str, host: str) -> Optional[SplitResult]:
+        """
+        The proxy that downloads URLs with the given scheme and host, or None if they're downloaded directly.
+
+        :raises ExtractorError if the proxy isn't an HTTP proxy
+        """
+        if self.proxy is not None:
+            proxy = self.proxy
+        elif urllib.request.proxy_bypass(host):
+            return None
+        else:
+            proxy = urllib.request.getproxies().get(scheme, '')
+        if not proxy:
+            return None
+        if '://' not in proxy:
+            proxy = 'http://' + proxy
+        parsed_proxy = urlsplit(proxy)
+        if parsed_proxy.scheme != 'http':
+            raise ExtractorError('Unsupported proxy {}, only HTTP proxies are supported'.format(proxy), expected=True)
+        return parsed_proxy
+
+    @staticmethod
+    def _get_proxy_headers(proxy: SplitResult) -> dict[str, str]:
+        if proxy.username is None:
+            return {}
+        credentials = '{}:{}'.format(unquote(proxy.username), unquote(proxy.password or ''))
+        return {'Proxy-Authorization': 'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')}
+
+    def _new_connection(self, scheme: str, netloc: str, proxy: Optional[SplitResult] = None
+                        ) -> http.client.HTTPConnection:
+        connection: http.client.HTTPConnection
+        if proxy is None:
+            connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            connection = connection_class(netloc, timeout=self.timeout)
+        elif scheme == 'https':
+            # HTTPS is tunneled through the proxy with a CONNECT request
+            connection = http.client.HTTPSConnection(proxy.hostname or '', proxy.port or 80, timeout=self.timeout)
+            connection.set_tunnel(netloc, headers=self._get_proxy_headers(proxy))
+        else:
+            connection = http.client.HTTPConnection(proxy.hostname or '', proxy.port or 80, timeout=self.timeout)
+        connection._create_connection = _create_ipv4_connection  # type: ignore[attr-defined]
+        return connection
+
+    def _get_connection(self, scheme: str, netloc: str, proxy: Optional[SplitResult] = None
+                        ) -> tuple[http.client.HTTPConnection, bool]:
+        """
+        Get an idle connection to the host or open a new one.
+        Also returns whether the connection is being reused.
+        """
+        with self._lock:
+            idle_connections = self._idle_connections.get((scheme, netloc))
+            if idle_connections:
+                return idle_connections.pop(), True
+        return self._new_connection(scheme, netloc, proxy), False
+
+    def _release_connection(self, scheme: str, netloc: str, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle_connections = self._idle_connections.setdefault((scheme, netloc), [])
+            if len(idle_connections) < self.pool_size:
+                idle_connections.append(connection)
+                return
+        connection.close()
+
+    def _request(self, url: str, read: Callable[[http.client.HTTPResponse], bytes] = http.client.HTTPResponse.read,
+                 data: Optional[bytes] = None, headers: Optional[dict[str, str]] = None
+                 ) -> tuple[int, str, bytes, http.client.HTTPMessage]:
+        parsed_url = urlsplit(url)
+        scheme, netloc = parsed_url.scheme, parsed_url.netloc
+        path = parsed_url.path or '/'
+        if parsed_url.query:
+            path += '?' + parsed_url.query
+        request_headers = {'User-Agent': std_headers['User-Agent'], 'Accept': '*/*'}
+        request_headers.update(headers or {})
+        cookie_request = self._add_cookies(url, request_headers)
+        method = 'GET' if data is None else 'POST'
+
+        proxy = self._get_proxy(scheme, parsed_url.hostname or '')
+        if proxy is not None and scheme != 'https':
+            # plain HTTP requests are sent to the proxy with the whole URL
+            path = parsed_url._replace(path=parsed_url.path or '/', fragment='').geturl()
+            request_headers.update(self._get_proxy_headers(proxy))
+
+        connection, reused = self._get_connection(scheme, netloc, proxy)
+        try:
+            try:
+                connection.request(method, path, body=data, headers=request_headers)
+                resp = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if not reused:
+                    raise
+                # idle connection was closed by the server, try again with a new one
+                connection.close()
+                connection = self._new_connection(scheme, netloc, proxy)
+                connection.request(method, path, body=data, headers=request_headers)
+                resp = connection.getresponse()
+            self.downloader.cookiejar.extract_cookies(resp, cookie_request)
+            body = read(resp)
+        except BaseException:
+            connection.close()
+            raise
+
+        # connections with unread content can't be reused
+        if resp.will_close or not resp.isclosed():
+            connection.close()
+        else:
+            self._release_connection(scheme, netloc, connection)
+        return resp.status, resp.reason, body, resp.headers
+
+    def _add_cookies(self, url: str, headers: dict[str, str]) -> urllib.request.Request:
+        """
+        Add the cookie jar's cookies for the URL to headers.
+        Returns the request that the response's cookies need to be extracted with.
+        """
+        cookie_request = urllib.request.Request(url)
+        self.downloader.cookiejar.add_cookie_header(cookie_request)
+        headers.update(cookie_request.unredirected_hdrs)
+        return cookie_request
+
+    def fetch(self, url: str, read: Callable[[http.client.HTTPResponse], bytes] = http.client.HTTPResponse.read
+              ) -> tuple[bytes, http.client.HTTPMessage]:
+        """
+        Download the content of a URL, reusing an open connection to its host if there's one available.
+        Returns the response's body and headers.
+        The read parameter can replace the function that reads the body from the response,
+        for example to stop reading before the end.
+
+        :raises ExtractorError
+        """
+        return self.retry_policy.call(url, lambda: self._fetch(url, read))
+
+    def _fetch(self, url: str, read: Callable[[http.client.HTTPResponse], bytes]
+               ) -> tuple[bytes, http.client.HTTPMessage]:
+        request_url = url
+        for _ in range(self._MAX_REDIRECTS + 1):
+            try:
+                status, reason, body, headers = self._request(request_url, read)
+            except (OSError, http.client.HTTPException) as e:
+                raise ExtractorError('Unable to download {}: {}'.format(url, e), cause=e)
+
+            if status in (301, 302, 303, 307, 308) and headers.get('Location'):
+                request_url = urljoin(request_url, headers['Location'])
+                continue
+            if status >= 400:
+                raise ExtractorError('Unable to download {}: HTTP Error {}: {}'.format(url, status, reason),
+                                     cause=compat_HTTPError(request_url, status, reason, headers, None))
+            return body, headers
+
+        raise ExtractorError('Unable to download {}: too many redirects'.format(url))
+
+    def fetch_until(self, url: str, make_find: Callable[[], Callable[[bytearray], Optional[T]]],
+                    chunk_size: int = 16 * 1024) -> Optional[T]:
+        """
+        Download the content of a URL chunk by chunk and stop as soon as the content found so far has what's needed.
+        make_find is called at the start of each successful response, including retries, and returns a find function
+        that's called after each chunk with all the content downloaded so far,
+        so it can resume its search where the previous call stopped instead of searching it all again.
+        Redirects and error responses are read whole, without calling find.
+        Returns the first value other than None returned by find, or None if the whole content was downloaded
+        without finding anything.
+
+        :raises ExtractorError
+        """
+        found: Optional[T] = None
+
+        def _read(resp: http.client.HTTPResponse) -> bytes:
+            nonlocal found
+            found = None
+            if not 200 <= resp.status < 300:
+                return resp.read()
+            find = make_find()
+            content = bytearray()
+            while found is None:
+                chunk = resp.read(chunk_size)
+                if not chunk:
+                    break
+                content += chunk
+                found = find(content)
+            return bytes(content)
+
+        self.fetch(url, read=_read)
+        return found
+
+    async def _async_request(self, url: str, data: Optional[bytes] = None, headers: Optional[dict[str, str]] = None
+                             ) -> tuple[int, str, bytes, http.client.HTTPMessage]:
+        parsed_url = urlsplit(url)
+        if self._get_proxy(parsed_url.scheme, parsed_url.hostname or '') is not None:
+            # downloads through a proxy use the pooled connections, in the default executor
+            return await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(self._request, url, http.client.HTTPResponse.read, data, headers))
+
+        host = parsed_url.hostname or ''
+        is_https = parsed_url.scheme == 'https'
+        port = parsed_url.port or (443 if is_https else 80)
+        path = parsed_url.path or '/'
+        if parsed_url.query:
+            path += '?' + parsed_url.query
+
+        request_headers = {
+            'Host': parsed_url.netloc,
+            'User-Agent': std_headers['User-Agent'],
+            'Accept': '*/*',
+            'Connection': 'close',
+        }
+        request_headers.update(headers or {})
+        cookie_request = self._add_cookies(url, request_headers)
+        if data is not None:
+            request_headers['Content-Length'] = str(len(data))
+        request = '{} {} HTTP/1.1\r\n'.format('GET' if data is None else 'POST', path)
+        request += ''.join('{}: {}\r\n'.format(name, value) for name, value in request_headers.items())
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ssl.create_default_context() if is_https else None,
+                                    family=socket.AF_INET),
+            self.timeout)
+        try:
+            writer.write(request.encode('latin-1') + b'\r\n' + (data or b''))
+            await asyncio.wait_for(writer.drain(), self.timeout)
+
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.timeout)
+            status_line, _, header_lines = head.partition(b'\r\n')
+            status_parts = status_line.decode('latin-1').split(' ', 2)
+            if len(status_parts) < 2 or not status_parts[0].startswith('HTTP/') or not status_parts[1].isdigit():
+                raise http.client.BadStatusLine(status_line.decode('latin-1'))
+            status, reason = int(status_parts[1]), status_parts[2].strip() if len(status_parts) > 2 else ''
+            resp_headers = http.client.parse_headers(io.BytesIO(header_lines))
+
+            if resp_headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                chunks = []
+                while True:
+                    size_line = await asyncio.wait_for(reader.readuntil(b'\r\n'), self.timeout)
+                    chunk_size = int(size_line.split(b';')[0], 16)
+                    if chunk_size == 0:
+                        break
+                    chunks.append(await asyncio.wait_for(reader.readexactly(chunk_size + 2), self.timeout))
+                body = b''.join(chunk[:-2] for chunk in chunks)
+            elif resp_headers.get('Content-Length') is not None:
+                body = await asyncio.wait_for(reader.readexactly(int(resp_headers['Content-Length'])), self.timeout)
+            else:
+                body = await asyncio.wait_for(reader.read(), self.timeout)
+        finally:
+            writer.close()
+            try:
+                await asyncio.wait_for(writer.wait_closed(), self.timeout)
+            except (OSError, asyncio.TimeoutError):
+                pass  # errors while closing don't change the response, or the error that was already raised
+        self.downloader.cookiejar.extract_cookies(urllib.response.addinfourl(io.BytesIO(), resp_headers, url),
+                                                  cookie_request)
+        return status, reason, body, resp_headers
+
+    async def async_fetch(self, url: str, data: Optional[bytes] = None, headers: Optional[dict[str, str]] = None
+                          ) -> tuple[bytes, http.client.HTTPMessage]:
+        """
+        Same as fetch, but with asyncio.
+        If data is passed, it's sent in a POST request.
+        Each download opens its own connection, so this doesn't use the Session's pool,
+        except for downloads through a proxy, which use the pool in the event loop's default executor.
+
+        :raises ExtractorError
+        """
+        return await self.retry_policy.async_call(url, lambda: self._async_fetch(url, data, headers))
+
+    async def _async_fetch(self, url: str, data: Optional[bytes], headers: Optional[dict[str, str]]
+                           ) -> tuple[bytes, http.client.HTTPMessage]:
+        request_url = url
+        for _ in range(self._MAX_REDIRECTS + 1):
+            try:
+                status, reason, body, resp_headers = await self._async_request(request_url, data, headers)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, http.client.HTTPException,
+                    ValueError) as e:
+                raise ExtractorError('Unable to download {}: {}'.format(url, e), cause=e)
+
+            if status in (301, 302, 303, 307, 308) and resp_headers.get('Location'):
+                request_url = urljoin(request_url, resp_headers['Location'])
+                if status == 303:
+                    data = None
+                continue
+            if status >= 400:
+                raise ExtractorError('Unable to download {}: HTTP Error {}: {}'.format(url, status, reason),
+                                     cause=compat_HTTPError(request_url, status, reason, resp_headers, None))
+            return body, resp_headers
+
+        raise ExtractorError('Unable to download {}: too many redirects'.format(url))
+
+    def close(self) -> None:
+        """
+        Close all the idle connections.
+        """
+        with self._lock:
+            idle_connections = [conn for conns in self._idle_connections.values() for conn in conns]
+            self._idle_connections.clear()
+        for connection in idle_connections:
+            connection.close()
+
+
+_default_session: Optional[Session] = None
+_default_session_lock = threading.Lock()
+
+
+def get_default_session() -> Session:
+    """
+    The Session that's shared by all the videos and images that weren't given a Session explicitly.
+    """
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = Session()
+        return _default_session
@@ -0,0 +1,33 @@
+"""
+WebVTT thumbnails tracks, which video players use to show a frame when hovering over the seek bar.
+Each cue points to the image with the frame and the frame's position in it, like image.jpg#xywh=0,0,160,90
+"""
+from typing import Iterable
+
+
+def format_timestamp(seconds: float) -> str:
+    """
+    Timestamp in WebVTT's format, like 01:02:03.456
+    """
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 60 * 60 * 1000)
+    minutes, milliseconds = divmod(milliseconds, 60 * 1000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return '{:02d}:{:02d}:{:02d}.{:03d}'.format(hours, minutes, seconds, milliseconds)
+
+
+def frame_url(url: str, x: int, y: int, width: int, height: int) -> str:
+    """
+    URL of the frame in the given rectangle of an image, using a media fragment.
+    """
+    return '{}#xywh={},{},{},{}'.format(url, x, y, width, height)
+
+
+def make_webvtt(cues: Iterable[tuple[float, float, str]]) -> str:
+    """
+    WebVTT file with a cue for each tuple of (start, end, text), where start and end are in seconds.
+    """
+    lines = ['WEBVTT', '']
+    for start, end, text in cues:
+        lines += ['{} --> {}'.format(format_timestamp(start), format_timestamp(end)), text, '']
+    return '\n'.join(lines)